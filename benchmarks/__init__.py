@@ -0,0 +1 @@
+# Offline benchmarks for the standup hot paths (see benchmarks/README.md)
@@ -0,0 +1,43 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare benchmarks/results/OLD.json benchmarks/results/NEW.json [--threshold 0.1]
+
+Exits with status 1 when any benchmark got slower by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+def _index(report):
+    return {(r["benchmark"], r["size"]): r for r in report["results"]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction (default 0.10)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    old, new = _index(baseline), _index(candidate)
+
+    print(f"{'benchmark':<20} {'size':>7} {baseline['commit']:>14} {candidate['commit']:>14} {'change':>8}")
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]["seconds"], new[key]["seconds"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key[0]:<20} {key[1]:>7} {before:>13.3f}s {after:>13.3f}s {change:>+7.1%}{flag}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{key[0]:<20} {key[1]:>7} only in {'baseline' if key in old else 'candidate'}")
+
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Minimal stand-in for the Slack Web API, served locally over HTTP
+import asyncio
+import threading
+from aiohttp import web
+
+class FakeSlackServer:
+    """Answers the Web API methods the bot uses, with optional per-call latency.
+
+    Runs on its own thread and event loop so both the sync WebClient and the
+    AsyncWebClient can talk to it. Point the clients at ``base_url``.
+    """
+
+    def __init__(self, latency_ms=0, channel_count=0, user_count=0):
+        self.latency = latency_ms / 1000
+        self.channels = [
+            {"id": f"C{i:08d}", "name": f"channel-{i:06d}", "is_private": i % 10 == 0, "is_archived": False}
+            for i in range(channel_count)
+        ]
+        self.users = [
+            {"id": f"U{i:08d}", "name": f"user{i}", "profile": {"real_name": f"User {i}"}, "is_bot": False, "deleted": False}
+            for i in range(user_count)
+        ]
+        self.calls = {}
+        self.port = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/api/"
+
+    async def _params(self, request):
+        params = dict(request.query)
+        if request.content_type == "application/json":
+            params.update(await request.json())
+        else:
+            params.update(await request.post())
+        return params
+
+    def _page(self, items, key, params):
+        limit = int(params.get("limit") or 100)
+        offset = int(params.get("cursor") or 0)
+        page = items[offset:offset + limit]
+        next_cursor = str(offset + limit) if offset + limit < len(items) else ""
+        return {"ok": True, key: page, "response_metadata": {"next_cursor": next_cursor}}
+
+    async def _handle(self, request):
+        method = request.match_info["method"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        params = await self._params(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method == "conversations.open":
+            users = params.get("users", "")
+            user = users[0] if isinstance(users, list) else users.split(",")[0]
+            return web.json_response({"ok": True, "channel": {"id": f"D{user[1:]}"}})
+        if method == "chat.postMessage":
+            return web.json_response({"ok": True, "channel": params.get("channel"), "ts": "1700000000.000100"})
+        if method == "conversations.list":
+            return web.json_response(self._page(self.channels, "channels", params))
+        if method == "users.list":
+            return web.json_response(self._page(self.users, "members", params))
+        return web.json_response({"ok": False, "error": "unknown_method"})
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            app = web.Application()
+            app.router.add_route("*", "/api/{method}", self._handle)  # users.list is a GET
+            self._runner = web.AppRunner(app, access_log=None)
+            self._loop.run_until_complete(self._runner.setup())
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            self._loop.run_until_complete(site.start())
+            self.port = site._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-slack", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
@@ -0,0 +1,156 @@
+# Benchmarks for the standup hot paths. Import only after run.py has set up
+# sys.path, the Mongo/Redis stand-ins and SLACK_API_BASE_URL.
+import asyncio
+import contextlib
+import io
+import random
+import time
+from datetime import datetime
+from flask import Flask
+
+from agents.standup_agent import collect_standups
+from agents.summarizer_agent import fallback_summary
+from agents.prompt_compaction import compact_responses
+from db import async_models, models
+from slack.event_handler import handle_event
+
+WORKSPACE_ID = "TBENCH0001"
+TIMEZONES = ["America/New_York", "America/Los_Angeles", "Europe/London", "Europe/Paris", "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney", "UTC"]
+REPLY_TEMPLATES = [
+    "Yesterday: finished the {n} migration. Today: reviews. Blockers: none",
+    "Yesterday: pairing on ticket {n}. Today: same as yesterday. Blockers: waiting on design",
+    "Yesterday: oncall. Today: fix flaky test {n}. Blockers: blocked by CI outage",
+]
+
+# Replies as people actually send them: links, emoji, pasted logs, repeats
+NOISY_REPLY_TEMPLATES = [
+    "Yesterday: merged <https://github.com/acme/app/pull/{n}|PR {n}> :tada: :rocket:\nToday: reviews\nBlockers: none",
+    "same as yesterday",
+    "Blocked by CI again :sob: see <https://ci.acme.dev/builds/{n}>\n```" + "ERROR worker-{n} Traceback (most recent call last): ...\n" * 40 + "```",
+    "Today: pairing with <@U00000001|ana> on <#C0001|backend> ticket {n}, then oncall handoff. " * 4,
+]
+
+def _quiet():
+    # The code under test prints per item; keep that off the benchmark's terminal
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _seed_workspace(db, user_count, missing_dm_ratio=0.1):
+    db["workspaces"].insert_one({"workspace_id": WORKSPACE_ID, "workspace_name": "Bench", "bot_token": "xoxb-bench"})
+    if not user_count:
+        return
+    missing_every = int(1 / missing_dm_ratio) if missing_dm_ratio else 0
+    db["users"].insert_many([{
+        "workspace_id": WORKSPACE_ID,
+        "user_id": f"U{i:08d}",
+        "real_name": f"User {i}",
+        "dm_channel_id": None if missing_every and i % missing_every == 0 else f"D{i:08d}",
+        "updated_at": datetime.utcnow()
+    } for i in range(user_count)])
+
+def bench_collect_standups(db, size, slack):
+    """DM fan-out from collect_standups, 10% of users without a cached DM channel"""
+    _seed_workspace(db, size)
+    calls_before = dict(slack.calls)
+    start = time.perf_counter()
+    with _quiet():
+        asyncio.run(collect_standups(WORKSPACE_ID))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "ops_per_second": size / elapsed,
+        "slack_calls": {m: n - calls_before.get(m, 0) for m, n in slack.calls.items()},
+    }
+
+def bench_handle_event(db, size, slack):
+    """Ingest DM reply events through handle_event against an open run"""
+    _seed_workspace(db, 0)
+    models.create_standup_run(WORKSPACE_ID)
+    payloads = [{
+        "type": "event_callback",
+        "team_id": WORKSPACE_ID,
+        "event_id": f"Ev{i:010d}",
+        "event": {
+            "type": "message",
+            "channel_type": "im",
+            "channel": f"D{i:08d}",
+            "user": f"U{i:08d}",
+            "text": REPLY_TEMPLATES[i % len(REPLY_TEMPLATES)].format(n=i),
+            "ts": f"1700000000.{i:06d}",
+        },
+    } for i in range(size)]
+    with Flask(__name__).app_context():
+        start = time.perf_counter()
+        for payload in payloads:
+            handle_event(payload)
+        elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "ops_per_second": size / elapsed}
+
+def bench_summary_inputs(db, size, slack):
+    """Load a run's responses with get_responses_for_run, then build the fallback summary"""
+    _seed_workspace(db, 0)
+    run_id = models.create_standup_run(WORKSPACE_ID)
+    db["standup_responses"].insert_many([{
+        "workspace_id": WORKSPACE_ID,
+        "run_id": run_id,
+        "user_id": f"U{i % max(1, size // 2):08d}",
+        "text": REPLY_TEMPLATES[i % len(REPLY_TEMPLATES)].format(n=i),
+        "ts": f"1700000000.{i:06d}",
+        "created_at": datetime.utcnow()
+    } for i in range(size)])
+
+    start = time.perf_counter()
+    responses = asyncio.run(async_models.get_responses_for_run(WORKSPACE_ID, run_id))
+    fetched = time.perf_counter()
+    assembled = "\n".join([f"- <@{r['user_id']}>: {r['text']}" for r in responses])
+    summary = fallback_summary(assembled)
+    done = time.perf_counter()
+    return {
+        "seconds": done - start,
+        "ops_per_second": size / (done - start),
+        "fetch_seconds": fetched - start,
+        "summary_seconds": done - fetched,
+        "summary_chars": len(summary),
+    }
+
+def bench_prompt_compaction(db, size, slack):
+    """compact_responses over noisy replies: CPU cost plus estimated tokens saved"""
+    responses = [{
+        "user_id": f"U{i % max(1, size // 2):08d}",
+        "text": NOISY_REPLY_TEMPLATES[i % len(NOISY_REPLY_TEMPLATES)].format(n=i),
+    } for i in range(size)]
+    start = time.perf_counter()
+    _, stats = compact_responses(responses)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "ops_per_second": size / elapsed,
+        "tokens_before": stats["tokens_before"],
+        "tokens_after": stats["tokens_after"],
+        "duplicates_dropped": stats["duplicates_dropped"],
+    }
+
+def bench_refresh_schedules(db, size, slack):
+    """Rebuild every RedBeat entry from channel_preferences"""
+    import tasks
+
+    rng = random.Random(size)
+    db["channel_preferences"].insert_many([{
+        "workspace_id": f"T{i:09d}",
+        "channel_id": f"C{i:08d}",
+        "channel_name": f"standup-{i}",
+        "standup_time": f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 15):02d}",
+        "timezone": TIMEZONES[i % len(TIMEZONES)],
+    } for i in range(size)])
+    start = time.perf_counter()
+    with _quiet():
+        tasks.refresh_schedules()
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "ops_per_second": size / elapsed}
+
+BENCHMARKS = {
+    "collect_standups": (bench_collect_standups, [100, 1000, 10000], [100, 1000]),
+    "handle_event": (bench_handle_event, [1000, 10000], [1000]),
+    "summary_inputs": (bench_summary_inputs, [1000, 10000], [1000]),
+    "prompt_compaction": (bench_prompt_compaction, [100, 1000, 10000], [100, 1000]),
+    "refresh_schedules": (bench_refresh_schedules, [10000, 100000], [1000, 10000]),
+}
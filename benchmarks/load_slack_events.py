@@ -0,0 +1,176 @@
+"""Load-test /slack/events with correctly signed DM reply events.
+
+    python -m benchmarks.load_slack_events --users 2000 --window 60 --shape front
+
+Every request carries X-Slack-Request-Timestamp and an X-Slack-Signature
+computed with SLACK_SIGNING_SECRET, so verify_slack_request accepts it.
+The report shows ack latency percentiles, error rate and how many acks
+missed Slack's 3 second deadline.
+
+Replies are only stored when the team has an open standup run. Pass
+--create-run to insert one (uses MONGODB_URI / DB_NAME).
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+SLACK_ACK_DEADLINE_SECONDS = 3.0
+SHAPES = ("spike", "uniform", "front")
+
+def sign(signing_secret, timestamp, body):
+    basestring = f"v0:{timestamp}:{body}"
+    return "v0=" + hmac.new(signing_secret.encode(), basestring.encode(), hashlib.sha256).hexdigest()
+
+def build_event(team_id, i, text=None):
+    return {
+        "type": "event_callback",
+        "team_id": team_id,
+        "event_id": f"Ev{i:010d}",
+        "event_time": int(time.time()),
+        "event": {
+            "type": "message",
+            "channel_type": "im",
+            "channel": f"D{i:08d}",
+            "user": f"U{i:08d}",
+            "text": text or f"Yesterday: load test {i}. Today: more load. Blockers: none",
+            "ts": f"{int(time.time())}.{i % 1000000:06d}",
+        },
+    }
+
+def send_offsets(shape, count, window, rng):
+    """Seconds after start at which each reply is sent"""
+    if shape == "spike":
+        return [0.0] * count
+    if shape == "uniform":
+        return sorted(rng.uniform(0, window) for _ in range(count))
+    # front: most people answer right after the DM lands, with a long tail
+    return sorted(min(window, rng.expovariate(4.0 / window)) for _ in range(count))
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+async def _post(session, url, signing_secret, payload, retry_num, semaphore, results):
+    body = json.dumps(payload)
+    timestamp = str(int(time.time()))
+    headers = {
+        "Content-Type": "application/json",
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": sign(signing_secret, timestamp, body),
+    }
+    if retry_num:
+        headers["X-Slack-Retry-Num"] = str(retry_num)
+        headers["X-Slack-Retry-Reason"] = "http_timeout"
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with session.post(url, data=body, headers=headers) as resp:
+                await resp.read()
+                results.append((time.perf_counter() - start, resp.status))
+        except Exception as e:
+            results.append((time.perf_counter() - start, type(e).__name__))
+
+async def run_load(args):
+    rng = random.Random(args.seed)
+    offsets = send_offsets(args.shape, args.users, args.window, rng)
+    payloads = [build_event(args.team_id, i) for i in range(args.users)]
+    # Slack redelivers when an ack is slow; replay a fraction of events with X-Slack-Retry-Num
+    retries = [(rng.uniform(0, args.window) if args.shape != "spike" else 0.0, payloads[i], 1)
+               for i in range(args.users) if rng.random() < args.retry_ratio]
+    schedule = sorted([(offset, payload, 0) for offset, payload in zip(offsets, payloads)] + retries, key=lambda s: s[0])
+
+    results = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        start = time.perf_counter()
+        tasks = []
+        for offset, payload, retry_num in schedule:
+            delay = start + offset - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_post(session, args.url, args.signing_secret, payload, retry_num, semaphore, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def summarize(results, elapsed):
+    latencies = sorted(latency for latency, _ in results)
+    statuses = {}
+    for _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if status != "200")
+    return {
+        "requests": len(results),
+        "elapsed_seconds": elapsed,
+        "requests_per_second": len(results) / elapsed if elapsed else None,
+        "statuses": statuses,
+        "error_rate": errors / len(results) if results else 0.0,
+        "missed_ack_deadline": sum(1 for l in latencies if l > SLACK_ACK_DEADLINE_SECONDS),
+        "latency_seconds": {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+def create_open_run(team_id):
+    from pymongo import MongoClient
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    runs = client[os.getenv("DB_NAME", "standup")]["standup_runs"]
+    res = runs.insert_one({"workspace_id": team_id, "created_by": "load_test", "created_at": datetime.utcnow(), "status": "open"})
+    return str(res.inserted_id)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:4000/slack/events")
+    parser.add_argument("--signing-secret", default=os.getenv("SLACK_SIGNING_SECRET"))
+    parser.add_argument("--team-id", default="TLOADTEST")
+    parser.add_argument("--users", type=int, default=1000, help="number of replies (one per user)")
+    parser.add_argument("--window", type=float, default=60.0, help="seconds over which replies arrive")
+    parser.add_argument("--shape", choices=SHAPES, default="front",
+                        help="spike: all at once; uniform: spread evenly; front: most early with a long tail")
+    parser.add_argument("--retry-ratio", type=float, default=0.0, help="fraction of events re-sent with X-Slack-Retry-Num")
+    parser.add_argument("--concurrency", type=int, default=500, help="max in-flight requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="client timeout per request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--create-run", action="store_true", help="insert an open standup run for --team-id first")
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.signing_secret:
+        parser.error("--signing-secret or SLACK_SIGNING_SECRET is required")
+    if args.create_run:
+        print(f"Created open run {create_open_run(args.team_id)} for {args.team_id}")
+
+    results, elapsed = asyncio.run(run_load(args))
+    report = {
+        "url": args.url,
+        "shape": args.shape,
+        "users": args.users,
+        "window_seconds": args.window,
+        "retry_ratio": args.retry_ratio,
+        **summarize(results, elapsed),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["error_rate"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
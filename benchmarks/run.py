@@ -0,0 +1,79 @@
+"""Run the offline hot-path benchmarks and store the results as JSON.
+
+    python -m benchmarks.run [--quick] [--only NAME ...] [--mongo-uri URI]
+
+By default Mongo is an in-memory mongomock database and Redis is fakeredis;
+Slack is always the local FakeSlackServer. Results go to
+benchmarks/results/<commit>.json for comparison with benchmarks.compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+def _git_commit():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=ROOT) != 0
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="benchmarks to run (default: all)")
+    parser.add_argument("--mongo-uri", help="use a local MongoDB instead of mongomock (database standup_bench is dropped between runs)")
+    parser.add_argument("--slack-latency-ms", type=float, default=0, help="artificial latency per fake Slack call")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.standins import prepare_offline_environment, reset_database
+
+    # Must happen before server modules are imported
+    db, slack, _ = prepare_offline_environment(args.slack_latency_ms, args.mongo_uri)
+    from benchmarks.hot_paths import BENCHMARKS
+
+    names = args.only or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    try:
+        for name in names:
+            fn, sizes, quick_sizes = BENCHMARKS[name]
+            for size in (quick_sizes if args.quick else sizes):
+                reset_database(db)
+                measurement = fn(db, size, slack)
+                results.append({"benchmark": name, "size": size, **measurement})
+                print(f"{name:<20} size={size:<7} {measurement['seconds']:>9.3f}s  {measurement['ops_per_second']:>12.1f} ops/s")
+    finally:
+        slack.stop()
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mongo": "uri" if args.mongo_uri else "mongomock",
+        "slack_latency_ms": args.slack_latency_ms,
+        "quick": args.quick,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Replay full standups end to end against local fakes, with virtual time.
+
+    python -m benchmarks.simulate --workspaces 500 --users 8 --reply-latency lognormal:3.5,0.8
+
+Drives the real scheduler and server code paths:
+refresh_schedules tick -> start_standup_task -> POST /start -> DM fan-out
+-> signed replies on POST /slack/events -> resume_standup_task -> POST /resume.
+
+Waiting is virtual: the 2 minute beat tick, reply delays and the task's
+resume countdown advance a simulated clock instantly. Processing is real: every
+task and request runs for real, and its measured duration is charged to one of
+--workers simulated server workers. Reported latencies are in simulated seconds.
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BEAT_TICK_SECONDS = 120  # matches the refresh-every-2-mins beat entry
+
+def parse_latency(spec):
+    """Build a reply-latency sampler from exp:MEAN, lognormal:MU,SIGMA, uniform:LO,HI or const:SECONDS"""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    if kind == "exp" and len(values) == 1:
+        return lambda rng: rng.expovariate(1 / values[0])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "const" and len(values) == 1:
+        return lambda rng: values[0]
+    raise argparse.ArgumentTypeError(f"invalid latency distribution: {spec}")
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return None
+    pick = lambda pct: values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+    return {"p50": pick(50), "p90": pick(90), "p99": pick(99), "max": values[-1]}
+
+
+class LocalServiceHTTP:
+    """The slice of `requests` the scheduler uses, dispatched to the Flask app in-process"""
+
+    class _Response:
+        def __init__(self, resp):
+            self.status_code = resp.status_code
+            self.ok = resp.status_code < 400
+            self.text = resp.get_data(as_text=True)
+            self._json = resp.get_json(silent=True)
+
+        def json(self):
+            return self._json
+
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def post(self, url, json=None, headers=None, **kwargs):
+        return self._Response(self.client.post(urlparse(url).path, json=json, headers=headers))
+
+
+class Simulation:
+    def __init__(self, args, db, celery):
+        from app import app as flask_app
+        import tasks
+
+        self.args = args
+        self.db = db
+        self.celery = celery
+        self.tasks = tasks
+        self.rng = random.Random(args.seed)
+        self.reply_latency = parse_latency(args.reply_latency)
+        self.http = LocalServiceHTTP(flask_app)
+        self.events_client = flask_app.test_client()
+        # Scheduler HTTP calls go to the in-process server; resume countdowns go to the virtual clock
+        tasks.requests = self.http
+        tasks.resume_standup_task.apply_async = self._enqueue_resume
+
+        self.epoch = datetime.now(timezone.utc).replace(hour=8, minute=50, second=0, microsecond=0)
+        self.queue = []
+        self.seq = 0
+        self.workers = [0.0] * args.workers
+        self.beat_free_at = 0.0
+        self.now = 0.0
+        self._pending_resumes = []
+        self.scheduled = set()
+        self.workspaces = {}
+        self.kickoff = []
+        self.summary = []
+        self.event_acks = []
+        self.replies_sent = 0
+        self.replies_in_time = 0
+        self.missed = 0
+
+    # -- virtual clock -------------------------------------------------------
+    def push(self, at, kind, data=None):
+        self.seq += 1
+        heapq.heappush(self.queue, (at, self.seq, kind, data))
+
+    def run_on_worker(self, at, fn):
+        """Run fn for real and charge its duration to the earliest free simulated worker"""
+        slot = min(range(len(self.workers)), key=self.workers.__getitem__)
+        begin = max(at, self.workers[slot])
+        started = time.perf_counter()
+        result = fn()
+        end = begin + (time.perf_counter() - started)
+        self.workers[slot] = end
+        return end, result
+
+    def _enqueue_resume(self, args=None, kwargs=None, countdown=0, **options):
+        self._pending_resumes.append((args[0], kwargs or {}, countdown or 0))
+
+    # -- setup -----------------------------------------------------------------
+    def seed(self):
+        spread = self.args.spread_minutes
+        self.db["workspaces"].insert_many([{
+            "workspace_id": f"TSIM{w:06d}", "workspace_name": f"Sim {w}", "bot_token": f"xoxb-sim-{w}"
+        } for w in range(self.args.workspaces)])
+        users, prefs = [], []
+        for w in range(self.args.workspaces):
+            workspace_id = f"TSIM{w:06d}"
+            start = self.epoch + timedelta(minutes=10 + (self.rng.randrange(spread) if spread else 0))
+            self.workspaces[workspace_id] = {"user_ids": [f"U{w:06d}{u:04d}" for u in range(self.args.users)]}
+            prefs.append({
+                "workspace_id": workspace_id, "channel_id": f"C{w:08d}", "channel_name": "standup",
+                "standup_time": start.strftime("%H:%M"), "timezone": "UTC",
+            })
+            users.extend({
+                "workspace_id": workspace_id, "user_id": uid, "real_name": uid, "dm_channel_id": f"D{uid[1:]}"
+            } for uid in self.workspaces[workspace_id]["user_ids"])
+        self.db["channel_preferences"].insert_many(prefs)
+        if users:
+            self.db["users"].insert_many(users)
+
+    # -- event handlers ----------------------------------------------------------
+    def on_tick(self, _):
+        from redbeat import RedBeatSchedulerEntry
+        from redbeat.schedulers import get_redis
+
+        begin = max(self.now, self.beat_free_at)
+        started = time.perf_counter()
+        self.tasks.refresh_schedules()
+        self.beat_free_at = begin + (time.perf_counter() - started)
+
+        redis = get_redis(self.celery)
+        for key in redis.zrange(self.celery.redbeat_conf.schedule_key, 0, -1):
+            key = key.decode() if isinstance(key, bytes) else key
+            if key in self.scheduled:
+                continue
+            entry = RedBeatSchedulerEntry.from_key(key, app=self.celery)
+            if entry.task != "tasks.start_standup_task":
+                continue
+            hour, minute = min(entry.schedule.hour), min(entry.schedule.minute)
+            due = (self.epoch.replace(hour=hour, minute=minute) - self.epoch).total_seconds()
+            self.scheduled.add(key)
+            if due < self.beat_free_at:
+                self.missed += 1  # entry written after its time; RedBeat would fire tomorrow
+                continue
+            self.push(due, "start", {"args": entry.args, "due": due})
+
+    def on_start(self, data):
+        workspace_id, channel_id = data["args"]
+        end, result = self.run_on_worker(self.now, lambda: self.tasks.start_standup_task(workspace_id, channel_id))
+        self.kickoff.append(end - data["due"])
+        for thread_id, task_kwargs, countdown in self._pending_resumes:
+            self.push(end + countdown, "resume", {"thread_id": thread_id, "kwargs": task_kwargs, "workspace_id": workspace_id, "due": data["due"]})
+        self._pending_resumes = []
+        if not result or result.get("error"):
+            return
+        state = self.workspaces[workspace_id]
+        state["open"] = True
+        for uid in state["user_ids"]:
+            if self.rng.random() < self.args.reply_rate:
+                self.push(end + self.reply_latency(self.rng), "reply", {"workspace_id": workspace_id, "user_id": uid})
+
+    def on_reply(self, data):
+        from benchmarks.load_slack_events import build_event, sign
+
+        self.replies_sent += 1
+        if self.workspaces[data["workspace_id"]].get("open"):
+            self.replies_in_time += 1
+        payload = build_event(data["workspace_id"], self.replies_sent)
+        payload["event"]["user"] = data["user_id"]
+        body = json.dumps(payload)
+        timestamp = str(int(time.time()))
+        headers = {
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": sign(os.environ["SLACK_SIGNING_SECRET"], timestamp, body),
+        }
+        started = time.perf_counter()
+        self.run_on_worker(self.now, lambda: self.events_client.post("/slack/events", data=body, headers=headers, content_type="application/json"))
+        self.event_acks.append(time.perf_counter() - started)
+
+    def on_resume(self, data):
+        end, _ = self.run_on_worker(self.now, lambda: self.tasks.resume_standup_task(data["thread_id"], **data["kwargs"]))
+        self.workspaces[data["workspace_id"]]["open"] = False
+        self.summary.append(end - data["due"])
+
+    # -- driver ------------------------------------------------------------------
+    def run(self):
+        last_due = 10 * 60 + self.args.spread_minutes * 60
+        for tick in range(0, int(last_due) + BEAT_TICK_SECONDS, BEAT_TICK_SECONDS):
+            self.push(float(tick), "tick")
+        handlers = {"tick": self.on_tick, "start": self.on_start, "reply": self.on_reply, "resume": self.on_resume}
+
+        wall_start = time.perf_counter()
+        while self.queue:
+            self.now, _, kind, data = heapq.heappop(self.queue)
+            handlers[kind](data)
+        wall = time.perf_counter() - wall_start
+        virtual_span = max([self.now, *self.workers])
+
+        return {
+            "workspaces": self.args.workspaces,
+            "users_per_workspace": self.args.users,
+            "workers": self.args.workers,
+            "reply_latency": self.args.reply_latency,
+            "standups_completed": len(self.summary),
+            "missed_schedules": self.missed,
+            "replies_sent": self.replies_sent,
+            "replies_before_resume": self.replies_in_time,
+            "virtual_seconds": virtual_span,
+            "wall_seconds": wall,
+            "compression": virtual_span / wall if wall else None,
+            "standups_per_wall_second": len(self.summary) / wall if wall else None,
+            "time_to_kickoff_seconds": percentiles(self.kickoff),
+            "time_to_summary_seconds": percentiles(self.summary),
+            "event_ack_seconds": percentiles(self.event_acks),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=200)
+    parser.add_argument("--users", type=int, default=8, help="users per workspace")
+    parser.add_argument("--spread-minutes", type=int, default=30, help="standup times spread over this many minutes")
+    parser.add_argument("--reply-rate", type=float, default=0.9, help="fraction of users who reply")
+    parser.add_argument("--reply-latency", default="lognormal:3.5,0.8",
+                        help="exp:MEAN | lognormal:MU,SIGMA | uniform:LO,HI | const:S (seconds after the DM)")
+    parser.add_argument("--workers", type=int, default=4, help="simulated server worker slots")
+    parser.add_argument("--slack-latency-ms", type=float, default=0)
+    parser.add_argument("--mongo-uri", help="use a local MongoDB instead of mongomock (database standup_bench is dropped)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+    parse_latency(args.reply_latency)
+
+    sys.path.insert(0, ROOT)
+    # Seeded users already have their DMs open, and the fake Slack has one user list for every workspace
+    os.environ.setdefault("DM_PREWARM_LEAD_MINUTES", "0")
+    from benchmarks.standins import prepare_offline_environment, reset_database
+
+    db, slack, celery = prepare_offline_environment(args.slack_latency_ms, args.mongo_uri)
+    reset_database(db)
+    import contextlib
+    import io
+    try:
+        sim = Simulation(args, db, celery)
+        sim.seed()
+        # The pipeline prints per step; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = sim.run()
+    finally:
+        slack.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# Local stand-ins for MongoDB and Redis so benchmarks run without services
+import itertools
+import os
+import sys
+import mongomock
+from pymongo import InsertOne, UpdateOne
+
+def _bulk_write(collection, requests):
+    # mongomock's bulk_write lags behind pymongo's operation API, so apply ops one by one
+    for op in requests:
+        if isinstance(op, UpdateOne):
+            collection.update_one(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, InsertOne):
+            collection.insert_one(op._doc)
+        else:
+            raise NotImplementedError(f"{type(op).__name__} is not supported by the benchmark stand-in")
+
+
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._cursor if length is None else itertools.islice(self._cursor, length))
+
+
+class _AsyncCollection:
+    """Coroutine facade over a mongomock collection, shaped like AsyncMongoClient's"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return _AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def bulk_write(self, requests, ordered=True):
+        _bulk_write(self._collection, requests)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class _AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return _AsyncCollection(self._database[name])
+
+
+def install_mongomock(db_name="standup"):
+    """Route common.mongo's sync and async handles to one in-memory database.
+
+    Must run before any server module imports db.mongo, which binds these names.
+    Returns the mongomock database so callers can seed and reset it.
+    """
+    import common.mongo
+
+    database = mongomock.MongoClient()[db_name]
+    async_database = _AsyncDatabase(database)
+    mongomock.collection.Collection.bulk_write = lambda self, requests, ordered=True: _bulk_write(self, requests)
+    common.mongo.get_db = lambda: database
+    common.mongo.get_async_db = lambda: async_database
+    return database
+
+def install_fakeredis(celery_app):
+    """Give RedBeat an in-memory Redis for schedule writes"""
+    import fakeredis
+    from redbeat.schedulers import REDBEAT_REDIS_KEY
+
+    redis = fakeredis.FakeRedis()
+    setattr(celery_app, REDBEAT_REDIS_KEY, redis)
+    return redis
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def prepare_offline_environment(slack_latency_ms=0, mongo_uri=None, signing_secret="offline-signing-secret"):
+    """Start the fake Slack API and wire up Mongo/Redis stand-ins.
+
+    Call before importing any server or scheduler module. Returns (db, slack, celery).
+    """
+    from benchmarks.fake_slack import FakeSlackServer
+
+    sys.path[:0] = [ROOT, os.path.join(ROOT, "server"), os.path.join(ROOT, "schedular")]
+    slack = FakeSlackServer(latency_ms=slack_latency_ms).start()
+    os.environ["SLACK_API_BASE_URL"] = slack.base_url
+    os.environ["SLACK_SIGNING_SECRET"] = signing_secret
+    os.environ["OPENAI_API_KEY"] = ""
+    os.environ.setdefault("LANGGRAPH_SERVICE_URL", "http://standup-server.local")
+    if mongo_uri:
+        os.environ["MONGODB_URI"] = mongo_uri
+        os.environ["DB_NAME"] = "standup_bench"
+        from common.mongo import get_db
+        db = get_db()
+    else:
+        db = install_mongomock()
+
+    from celery_app import celery
+    install_fakeredis(celery)
+    return db, slack, celery
+
+def reset_database(db):
+    for name in db.list_collection_names():
+        db.drop_collection(name)
@@ -0,0 +1,103 @@
+"""Measure cold-start import time of the server, worker and init_db entry points.
+
+    python -m benchmarks.startup [--runs 5] [--report 15] [--only server ...] [--output FILE]
+
+Each run imports the entry module in a fresh interpreter, the same cost every
+pod start or worker fork pays before it can serve. The report lists the
+packages that dominate import time (from python -X importtime). It exits non-zero
+when an entry point's median exceeds its target or when a module that should
+load lazily (LangGraph, LangChain, OpenAI) is imported at startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (working directory, module, default target in ms)
+ENTRY_POINTS = {
+    "server": ("server", "app", 800),
+    "worker": ("schedular", "celery_app", 800),
+    "init_db": (os.path.join("server", "db"), "init_db", 500),
+}
+
+# Loaded on first use (graph / LLM call), never at startup
+LAZY_MODULES = ("langgraph", "langchain", "langchain_core", "langchain_openai", "openai")
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT
+    env["PRELOAD_GRAPH"] = "0"  # measure the path to the first request, not the background preload
+    env["TRACING_EXPORTER"] = ""
+    env["PROFILE_SAMPLE_RATE"] = "0"
+    return env
+
+def measure_import(entry):
+    """Seconds to import the entry module in a fresh interpreter"""
+    cwd, module, _ = ENTRY_POINTS[entry]
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.join(ROOT, cwd), env=_env(),
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def import_report(entry):
+    """Self import time per top-level package (microseconds) from python -X importtime"""
+    cwd, module, _ = ENTRY_POINTS[entry]
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=os.path.join(ROOT, cwd),
+                         env=_env(), capture_output=True, text=True, check=True)
+    packages = Counter()
+    modules = set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.add(name)
+        packages[name.split(".")[0]] += int(self_us)
+    lazy_loaded = sorted(m for m in LAZY_MODULES if m in modules)
+    return packages, lazy_loaded
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point (median is reported)")
+    parser.add_argument("--report", type=int, default=10, metavar="N", help="show the N slowest packages to import")
+    parser.add_argument("--only", nargs="+", choices=list(ENTRY_POINTS), help="entry points to measure (default: all)")
+    parser.add_argument("--target-ms", type=float, help="override every entry point's target")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = []
+    failed = False
+    for entry in args.only or list(ENTRY_POINTS):
+        target_ms = args.target_ms or ENTRY_POINTS[entry][2]
+        timings = [measure_import(entry) * 1000 for _ in range(args.runs)]
+        median_ms = statistics.median(timings)
+        packages, lazy_loaded = import_report(entry)
+        ok = median_ms <= target_ms and not lazy_loaded
+        failed = failed or not ok
+
+        print(f"{entry:<8} median {median_ms:7.1f} ms  (min {min(timings):.1f}, max {max(timings):.1f})  target {target_ms:.0f} ms  {'OK' if ok else 'FAIL'}")
+        for package, us in packages.most_common(args.report):
+            print(f"    {us / 1000:8.1f} ms  {package}")
+        if lazy_loaded:
+            print(f"    ⚠️ imported at startup but should load lazily: {', '.join(lazy_loaded)}")
+        results.append({
+            "entry": entry,
+            "median_ms": median_ms,
+            "timings_ms": timings,
+            "target_ms": target_ms,
+            "lazy_modules_loaded": lazy_loaded,
+            "top_packages_ms": {p: us / 1000 for p, us in packages.most_common(args.report)},
+        })
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
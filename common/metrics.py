@@ -0,0 +1,118 @@
+# Prometheus metrics shared by the server and the Celery worker
+import os
+import time
+import functools
+import inspect
+
+# prometheus_client picks multiprocess mode when it is imported, so settle the
+# directory first: create it, or fall back to per-process metrics if we can't
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+if MULTIPROC_DIR:
+    try:
+        os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"⚠️ PROMETHEUS_MULTIPROC_DIR {MULTIPROC_DIR} is unusable ({e}); metrics stay per process")
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        MULTIPROC_DIR = None
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST,
+    generate_latest, start_http_server,
+)
+from prometheus_client import multiprocess
+from common.tracing import traced
+
+# Buckets from 5ms up to 2 minutes: Mongo calls sit at the low end, LLM calls at the top
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+GRAPH_NODE_SECONDS = Histogram(
+    "standup_graph_node_seconds", "LangGraph node execution time", ["node"], buckets=LATENCY_BUCKETS
+)
+SLACK_API_SECONDS = Histogram(
+    "standup_slack_api_seconds", "Slack Web API call latency", ["method", "status"], buckets=LATENCY_BUCKETS
+)
+MONGO_OP_SECONDS = Histogram(
+    "standup_mongo_op_seconds", "db.models / db.async_models function latency", ["function"], buckets=LATENCY_BUCKETS
+)
+MONGO_POOL_WAIT_SECONDS = Histogram(
+    "standup_mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled Mongo connection", buckets=LATENCY_BUCKETS
+)
+LLM_CALL_SECONDS = Histogram(
+    "standup_llm_call_seconds", "LLM call latency", ["model", "outcome"], buckets=LATENCY_BUCKETS
+)
+CELERY_TASK_SECONDS = Histogram(
+    "standup_celery_task_seconds", "Celery task run time", ["task", "state"], buckets=LATENCY_BUCKETS
+)
+ASYNC_LOOP_LAG_SECONDS = Histogram(
+    "standup_async_loop_lag_seconds", "How late the shared event loop's heartbeat ran; anything blocking the loop shows up here",
+    buckets=LATENCY_BUCKETS
+)
+
+DMS_TOTAL = Counter("standup_dms_total", "Standup DMs by outcome", ["outcome"])
+DM_PREWARM_TOTAL = Counter("standup_dm_prewarm_total", "DM channels handled by the pre-kickoff warm-up by outcome", ["outcome"])
+RESPONSES_INGESTED_TOTAL = Counter("standup_responses_ingested_total", "Standup DM replies by outcome", ["outcome"])
+RUN_STARTS_TOTAL = Counter("standup_run_starts_total", "Standup start requests by outcome (attached = joined today's existing run)", ["outcome"])
+RESUMES_TOTAL = Counter("standup_resumes_total", "Workflow resumes by outcome", ["outcome"])
+LLM_PROMPT_TOKENS_TOTAL = Counter("standup_llm_prompt_tokens_total", "Estimated summary prompt tokens before and after compaction, by whether the run's prompt met SUMMARY_TOKEN_BUDGET", ["stage", "budget"])
+LLM_FALLBACKS_TOTAL = Counter("standup_llm_fallbacks_total", "Summaries that used fallback_summary, by reason", ["reason"])
+LLM_BREAKER_TRANSITIONS_TOTAL = Counter("standup_llm_breaker_transitions_total", "LLM circuit breaker state changes", ["state"])
+
+def timed(histogram, **labels):
+    """Decorator observing a function's run time; works for sync and async functions"""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    histogram.labels(**labels).observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.labels(**labels).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def timed_db(fn):
+    """Time and trace a data-access function, labelled e.g. models.get_user / async_models.get_user"""
+    label = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+    return traced(f"mongo.{label}")(timed(MONGO_OP_SECONDS, function=label)(fn))
+
+def _registry():
+    # With PROMETHEUS_MULTIPROC_DIR set (Celery prefork, gunicorn), aggregate every process's samples.
+    # Checked against the import-time value: setting it later (e.g. from .env) can't switch modes.
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def render_metrics():
+    """Return (body, content_type) for a /metrics response"""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+def start_metrics_server(port):
+    """Serve /metrics on its own port (used by the Celery worker)"""
+    start_http_server(port, registry=_registry())
+
+def mark_process_dead(pid):
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+def clear_multiproc_dir():
+    """Delete samples left by earlier runs; call once in the parent before workers fork"""
+    if not MULTIPROC_DIR:
+        return
+    for name in os.listdir(MULTIPROC_DIR):
+        if name.endswith(".db"):
+            try:
+                os.remove(os.path.join(MULTIPROC_DIR, name))
+            except FileNotFoundError:
+                pass
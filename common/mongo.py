@@ -0,0 +1,175 @@
+# Shared MongoDB connection factory for the server and the scheduler
+import os
+import asyncio
+import threading
+import weakref
+from pymongo import MongoClient, AsyncMongoClient, monitoring
+from dotenv import load_dotenv
+from common.metrics import MONGO_POOL_WAIT_SECONDS
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("DB_NAME", "standup")
+
+def _int_env(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+def client_options():
+    """Pool, timeout, read preference and write concern settings from the environment"""
+    options = {
+        "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE", 100),
+        "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE", 0),
+        "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS"),
+        "connectTimeoutMS": _int_env("MONGO_CONNECT_TIMEOUT_MS", 10000),
+        "serverSelectionTimeoutMS": _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000),
+        "socketTimeoutMS": _int_env("MONGO_SOCKET_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+    }
+    w = os.getenv("MONGO_WRITE_CONCERN_W")
+    if w:
+        options["w"] = int(w) if w.isdigit() else w
+    wtimeout = _int_env("MONGO_WRITE_CONCERN_TIMEOUT_MS")
+    if wtimeout is not None:
+        options["wTimeoutMS"] = wtimeout
+    return {k: v for k, v in options.items() if v is not None}
+
+
+class PoolCheckoutMetrics(monitoring.ConnectionPoolListener):
+    """Tracks how long operations wait to check a connection out of the pool"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.failed = {}
+        self.in_use = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+                "failed": dict(self.failed),
+                "in_use": self.in_use,
+            }
+
+    def connection_checked_out(self, event):
+        wait = event.duration or 0.0
+        MONGO_POOL_WAIT_SECONDS.observe(wait)
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.failed[event.reason] = self.failed.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_metrics = PoolCheckoutMetrics()
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+# AsyncMongoClient binds to the event loop it is first used on, so keep one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_client():
+    """Get the MongoClient for this process, creating it on first use.
+
+    Clients are never shared across a fork: a Celery prefork child or a
+    gunicorn worker gets its own client the first time it touches Mongo.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = MongoClient(MONGO_URI, connect=False, event_listeners=[pool_metrics], **client_options())
+                _client_pid = os.getpid()
+    return _client
+
+def get_db():
+    return get_client()[DB_NAME]
+
+def get_async_db():
+    """Get the async database handle for the running event loop"""
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        async_client = AsyncMongoClient(MONGO_URI, connect=False, event_listeners=[pool_metrics], **client_options())
+        _async_clients[loop] = async_client
+    return async_client[DB_NAME]
+
+def get_pool_metrics():
+    return pool_metrics.snapshot()
+
+def _reset_after_fork():
+    global _client, _client_pid, _client_lock, _async_clients
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    _async_clients = weakref.WeakKeyDictionary()
+    pool_metrics.reset()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _LazyCollection:
+    """Collection handle that resolves against the current process's client on use"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(get_db()[self._name], attr)
+
+
+class _LazyDatabase:
+    """Database handle that is safe to create at import time and use after a fork"""
+
+    def __getitem__(self, name):
+        return _LazyCollection(name)
+
+    def __getattr__(self, attr):
+        return getattr(get_db(), attr)
+
+
+db = _LazyDatabase()
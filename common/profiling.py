@@ -0,0 +1,95 @@
+# Opt-in sampling profiler for slow /start, /resume, /slack/events requests and Celery tasks.
+# Writes folded stacks ("frame;frame;frame count"), readable by flamegraph.pl, speedscope and inferno.
+import os
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # fraction profiled, 0 disables
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/standup-profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MIN_DURATION_MS = float(os.getenv("PROFILE_MIN_DURATION_MS", "0"))  # drop profiles faster than this
+
+def _frame_label(frame):
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+def _fold(frame):
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+class Profile:
+    """Wall-clock stack sampler for one thread plus any named helper threads.
+
+    Work handed to the async runner happens on its loop thread, so callers
+    pass that thread's name to see where the awaited time went.
+    """
+
+    def __init__(self, name, thread_names=(), interval_ms=PROFILE_INTERVAL_MS):
+        self.name = name
+        self.thread_names = set(thread_names)
+        self.interval = interval_ms / 1000
+        self.samples = Counter()
+        self._target = threading.get_ident()
+        self._target_name = threading.current_thread().name
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _threads(self):
+        threads = {self._target: self._target_name}
+        for thread in threading.enumerate():
+            if thread.name in self.thread_names and thread.ident is not None:
+                threads[thread.ident] = thread.name
+        return threads
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, label in self._threads().items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples[f"{label};{_fold(frame)}"] += 1
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        """Stop sampling and write the profile; returns its path (None if dropped)"""
+        self._stop.set()
+        self._sampler.join()
+        duration_ms = (time.perf_counter() - self.started) * 1000
+        if duration_ms < PROFILE_MIN_DURATION_MS or not self.samples:
+            return None
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(PROFILE_DIR, f"{self.name}-{stamp}-{int(duration_ms)}ms-{os.getpid()}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"🔥 Profile written: {path}")
+        return path
+
+def maybe_start(name, thread_names=()):
+    """Start a Profile for this unit of work if it is sampled, else None"""
+    if PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE:
+        return None
+    return Profile(name, thread_names).start()
+
+@contextmanager
+def profiled(name, thread_names=()):
+    profile = maybe_start(name, thread_names)
+    try:
+        yield profile
+    finally:
+        if profile is not None:
+            profile.stop()
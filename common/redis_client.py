@@ -0,0 +1,28 @@
+# Shared Redis client for the server (schedular uses Redis through Celery/RedBeat)
+import os
+import threading
+
+REDIS_URL = os.getenv("REDIS_URL")
+# Redis sits on the /slack/events ack path, so give up quickly and fall back
+REDIS_SOCKET_TIMEOUT_MS = int(os.getenv("REDIS_SOCKET_TIMEOUT_MS", "200"))
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_redis():
+    """Get the Redis client for this process, or None when REDIS_URL is not set.
+
+    Like the Mongo client, it is created lazily and never shared across a fork.
+    """
+    global _client, _client_pid
+    if not REDIS_URL:
+        return None
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                import redis
+                timeout = REDIS_SOCKET_TIMEOUT_MS / 1000
+                _client = redis.Redis.from_url(REDIS_URL, socket_timeout=timeout, socket_connect_timeout=timeout)
+                _client_pid = os.getpid()
+    return _client
@@ -0,0 +1,135 @@
+# Retention for standup data: TTL indexes on raw data plus rollups of closed runs
+import os
+import re
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from common.mongo import db
+
+RESPONSE_RETENTION_DAYS = int(os.getenv("RESPONSE_RETENTION_DAYS", "30"))
+RAW_EVENT_RETENTION_DAYS = int(os.getenv("RAW_EVENT_RETENTION_DAYS", "7"))
+RUN_RETENTION_DAYS = int(os.getenv("RUN_RETENTION_DAYS", "90"))
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", "500"))
+
+MAX_BLOCKER_CHARS = 280
+
+# The DM asks for "Yesterday / Today / Blockers", so most replies carry a "Blockers:" section.
+# It runs to the next section label or the end of the reply.
+_BLOCKERS_SECTION = re.compile(r"\bblockers?\s*:(.*?)(?=\b(?:yesterday|today)\s*:|$)", re.IGNORECASE | re.DOTALL)
+_NO_BLOCKERS = re.compile(
+    r"(?:none|n/?a|no|nothing|nope|nil|-+|—)"
+    r"(?:\s+(?:blockers?|issues?|problems?))?"
+    r"(?:\s+(?:today|yet|so far|for now|right now|atm|at the moment|really|major))?",
+    re.IGNORECASE
+)
+_CLAUSE_END = re.compile(r"[.,;!(]|\s[-/]\s")
+# Free-text replies: whole words only, so "unblocked" and "no blockers" don't count
+_BLOCKER_PHRASE = re.compile(r"\b(?:blocked\s+(?:by|on)|stuck|waiting\s+(?:on|for))\b", re.IGNORECASE)
+_NEGATION = re.compile(r"\b(?:no|not|never|without)\s+(?:\w+\s+)?$|n't\s+(?:\w+\s+)?$", re.IGNORECASE)
+
+def _has_blocker_phrase(text):
+    return any(not _NEGATION.search(text[:m.start()]) for m in _BLOCKER_PHRASE.finditer(text))
+
+def is_blocker(text):
+    """Whether a reply reports a blocker.
+
+    A "Blockers:" section decides on its own: empty or none / n/a / no / nothing / -
+    means no blocker, anything else is one. Without a section, look for
+    "blocked by", "stuck" or "waiting on/for" that isn't negated.
+    """
+    text = text or ""
+    sections = [m.group(1).strip(" \t\n/") for m in _BLOCKERS_SECTION.finditer(text)]
+    if sections:
+        return any(
+            section and not _NO_BLOCKERS.fullmatch(_CLAUSE_END.split(section, 1)[0].strip())
+            for section in sections
+        )
+    return _has_blocker_phrase(text)
+
+def _ensure_ttl_index(collection, field, days, name, partial=None):
+    """Create or retune a TTL index; days <= 0 disables expiry for the collection"""
+    existing = {idx["name"]: idx for idx in collection.list_indexes()}
+    if days <= 0:
+        if name in existing:
+            collection.drop_index(name)
+        return
+    seconds = days * 24 * 60 * 60
+    if name in existing:
+        if existing[name].get("expireAfterSeconds") != seconds:
+            db.command("collMod", collection.name, index={"name": name, "expireAfterSeconds": seconds})
+        return
+    options = {"name": name, "expireAfterSeconds": seconds}
+    if partial:
+        options["partialFilterExpression"] = partial
+    collection.create_index([(field, ASCENDING)], **options)
+
+def ensure_retention_indexes():
+    """Apply the configured retention windows (safe to call repeatedly)"""
+    _ensure_ttl_index(db["standup_responses"], "created_at", RESPONSE_RETENTION_DAYS, "responses_ttl")
+    _ensure_ttl_index(db["raw_events"], "created_at", RAW_EVENT_RETENTION_DAYS, "raw_events_ttl")
+    # Only runs that were compacted into standup_history are allowed to expire
+    _ensure_ttl_index(db["standup_runs"], "closed_at", RUN_RETENTION_DAYS, "rolled_up_runs_ttl", partial={"rolled_up": True})
+
+    history_col = db["standup_history"]
+    history_col.create_index([("run_id", ASCENDING)], unique=True)
+    history_col.create_index([("workspace_id", ASCENDING), ("created_at", DESCENDING)])
+    db["raw_events"].create_index([("run_id", ASCENDING)])
+
+def build_history_document(run, responses):
+    """Compact a closed run and its responses into one small history document"""
+    per_user = {}
+    blockers = []
+    for r in responses:
+        per_user[r["user_id"]] = per_user.get(r["user_id"], 0) + 1
+        if is_blocker(r.get("text")):
+            blockers.append({"user_id": r["user_id"], "text": (r.get("text") or "")[:MAX_BLOCKER_CHARS]})
+    return {
+        "run_id": str(run["_id"]),
+        "workspace_id": run["workspace_id"],
+        "created_by": run.get("created_by"),
+        "created_at": run.get("created_at"),
+        "closed_at": run.get("closed_at"),
+        "participants": sorted(per_user),
+        "participant_count": len(per_user),
+        "response_count": len(responses),
+        "summary": run.get("summary"),
+        "blockers": blockers,
+        "rolled_up_at": datetime.utcnow(),
+    }
+
+def rollup_closed_runs(batch_size=ROLLUP_BATCH_SIZE):
+    """Roll closed runs into standup_history and mark them for expiry.
+
+    Returns the number of runs rolled up. Upserts by run_id, so re-running
+    after a partial failure never duplicates history.
+    """
+    runs_col = db["standup_runs"]
+    responses_col = db["standup_responses"]
+    history_col = db["standup_history"]
+
+    rolled_up = 0
+    while True:
+        runs = list(runs_col.find({"status": "closed", "rolled_up": {"$ne": True}}).limit(batch_size))
+        if not runs:
+            break
+
+        run_ids = [str(run["_id"]) for run in runs]
+        responses_by_run = {}
+        for r in responses_col.find({"run_id": {"$in": run_ids}}, {"run_id": 1, "user_id": 1, "text": 1}):
+            responses_by_run.setdefault(r["run_id"], []).append(r)
+
+        history_col.bulk_write([
+            UpdateOne(
+                {"run_id": str(run["_id"])},
+                {"$set": build_history_document(run, responses_by_run.get(str(run["_id"]), []))},
+                upsert=True
+            )
+            for run in runs
+        ], ordered=False)
+        runs_col.update_many(
+            {"_id": {"$in": [run["_id"] for run in runs]}},
+            {"$set": {"rolled_up": True, "rolled_up_at": datetime.utcnow()}}
+        )
+        rolled_up += len(runs)
+        if len(runs) < batch_size:
+            break
+    return rolled_up
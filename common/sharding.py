@@ -0,0 +1,47 @@
+# Workspace -> server replica assignment by consistent hashing.
+# Off unless SERVER_SHARDS lists the replicas' base URLs.
+import os
+import hashlib
+from bisect import bisect
+
+SERVER_SHARDS = [u.strip().rstrip("/") for u in os.getenv("SERVER_SHARDS", "").split(",") if u.strip()]
+SHARD_SELF = os.getenv("SHARD_SELF", "").rstrip("/")  # this replica's entry in SERVER_SHARDS
+SHARD_VNODES = int(os.getenv("SHARD_VNODES", "128"))
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes.
+
+    Adding or removing a node only moves the keys in its arcs (about 1/N of
+    workspaces); everything else keeps its owner.
+    """
+
+    def __init__(self, nodes, vnodes=SHARD_VNODES):
+        self.nodes = list(nodes)
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key):
+        if not self._owners:
+            return None
+        i = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[i]
+
+_ring = HashRing(SERVER_SHARDS)
+
+def sharding_enabled():
+    return len(SERVER_SHARDS) > 1
+
+def shard_for(workspace_id, default=None):
+    """Base URL of the replica that owns the workspace (default when sharding is off)"""
+    if not sharding_enabled() or not workspace_id:
+        return default
+    return _ring.node_for(workspace_id)
+
+def owns(workspace_id):
+    """True if this replica should handle the workspace"""
+    owner = shard_for(workspace_id)
+    return owner is None or not SHARD_SELF or owner == SHARD_SELF
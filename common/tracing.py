@@ -0,0 +1,77 @@
+# Distributed tracing for a standup run: Celery task -> HTTP -> graph nodes -> Slack/Mongo/LLM.
+# Spans are no-ops unless TRACING_EXPORTER is set to "file" or "otlp".
+import os
+import functools
+import inspect
+from contextlib import contextmanager
+from opentelemetry import trace, propagate
+from opentelemetry.trace import SpanKind
+
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "/tmp/standup-traces.jsonl")
+TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+
+tracer = trace.get_tracer("standup")
+
+def init_tracing(service_name):
+    """Install the span exporter for this process (call once at startup)"""
+    if not TRACING_EXPORTER:
+        return
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if TRACING_EXPORTER == "otlp":
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter()
+    elif TRACING_EXPORTER == "file":
+        out = open(TRACING_FILE, "a", buffering=1)
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda s: s.to_json(indent=None) + "\n")
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {TRACING_EXPORTER}")
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+def inject_context():
+    """W3C trace headers (traceparent/tracestate) for the current span, as a plain dict"""
+    carrier = {}
+    propagate.inject(carrier)
+    return carrier
+
+def extract_context(carrier):
+    return propagate.extract(carrier or {})
+
+@contextmanager
+def span(name, carrier=None, kind=SpanKind.INTERNAL, **attributes):
+    """Start a span; carrier (headers or a stored dict) sets the parent when given.
+
+    Keyword attributes are recorded as standup.<name>; None values are skipped.
+    """
+    context = extract_context(carrier) if carrier is not None else None
+    attrs = {f"standup.{k}": v for k, v in attributes.items() if v is not None}
+    with tracer.start_as_current_span(name, context=context, kind=kind, attributes=attrs) as current:
+        yield current
+
+def traced(name, kind=SpanKind.INTERNAL):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.start_as_current_span(name, kind=kind):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name, kind=kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
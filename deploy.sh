@@ -1,10 +1,11 @@
 
 echo "Building Docker images..."
 
-docker build -t standup-server:latest ./server
+# server and scheduler build from the repo root so both images include common/
+docker build -t standup-server:latest -f server/Dockerfile .
 docker build -t standup-frontend:latest ./frontend
 
-docker build -t standup-scheduler:latest ./schedular
+docker build -t standup-scheduler:latest -f schedular/Dockerfile .
 
 echo "Loading images into Kubernetes..."
 docker save standup-server:latest | docker exec -i docker-desktop ctr -n=k8s.io images import -
@@ -30,6 +31,7 @@ fi
 kubectl apply -f k8s/mongodb-deployment.yaml
 kubectl apply -f k8s/redis-deployment.yaml
 kubectl apply -f k8s/server-deployment.yaml
+kubectl apply -f k8s/summary-worker-deployment.yaml
 kubectl apply -f k8s/frontend-deployment.yaml
 kubectl apply -f k8s/scheduler-deployment.yaml
 
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect, Suspense } from 'react';
+import { useState, useEffect, useRef, Suspense } from 'react';
 import { useSearchParams } from 'next/navigation';
 
 interface Channel {
@@ -14,13 +14,42 @@ interface Workspace {
   workspace_name: string;
 }
 
+interface SelectedChannel {
+  id: string;
+  name: string;
+  standup_time?: string | null;
+  timezone?: string | null;
+}
+
+interface WorkspaceSetup {
+  workspace: Workspace;
+  selected_channel: SelectedChannel | null;
+}
+
+interface ChannelPage {
+  channels: Channel[];
+  next_cursor: string | null;
+  total: number;
+  error?: string;
+}
+
+const CHANNEL_PAGE_SIZE = 100;
+
 function SetupPageContent() {
   const searchParams = useSearchParams();
   const workspaceId = searchParams.get('workspace_id');
   
   const [workspace, setWorkspace] = useState<Workspace | null>(null);
   const [channels, setChannels] = useState<Channel[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [totalChannels, setTotalChannels] = useState<number>(0);
+  const [channelQuery, setChannelQuery] = useState<string>('');
+  // Latest search input, so a slow response for an older query can be dropped
+  const channelQueryRef = useRef<string>('');
+  channelQueryRef.current = channelQuery;
+  const [loadingMore, setLoadingMore] = useState(false);
   const [selectedChannel, setSelectedChannel] = useState<string>('');
+  const [selectedChannelName, setSelectedChannelName] = useState<string>('');
   const [standupTime, setStandupTime] = useState<string>('09:00');
   const [timezone, setTimezone] = useState<string>('America/New_York');
   const [loading, setLoading] = useState(true);
@@ -31,18 +60,34 @@ function SetupPageContent() {
 
   useEffect(() => {
     if (workspaceId) {
-      loadWorkspaceInfo();
-      loadChannels();
-      loadChannelPreferences();
+      loadSetup();
     }
   }, [workspaceId]);
 
-  const loadWorkspaceInfo = async () => {
+  // Debounce name-prefix search; the server answers from its channel cache
+  useEffect(() => {
+    if (!workspaceId) return;
+    const timer = setTimeout(() => loadChannels({ query: channelQuery }), 250);
+    return () => clearTimeout(timer);
+  }, [workspaceId, channelQuery]);
+
+  // Workspace, saved channel and schedule in one request (revalidated with ETag)
+  const loadSetup = async () => {
     try {
-      const response = await fetch(`${backendUrl}/workspaces/${workspaceId}`);
+      const response = await fetch(`${backendUrl}/api/workspace/${workspaceId}/setup`);
       if (response.ok) {
-        const workspace = await response.json();
-        setWorkspace(workspace);
+        const data: WorkspaceSetup = await response.json();
+        setWorkspace(data.workspace);
+        if (data.selected_channel) {
+          setSelectedChannel(data.selected_channel.id);
+          setSelectedChannelName(data.selected_channel.name);
+          if (data.selected_channel.standup_time) {
+            setStandupTime(data.selected_channel.standup_time);
+          }
+          if (data.selected_channel.timezone) {
+            setTimezone(data.selected_channel.timezone);
+          }
+        }
       } else {
         setWorkspace({
           workspace_id: workspaceId!,
@@ -50,7 +95,7 @@ function SetupPageContent() {
         });
       }
     } catch (error) {
-      console.error('Error loading workspace info:', error);
+      console.error('Error loading workspace setup:', error);
       setWorkspace({
         workspace_id: workspaceId!,
         workspace_name: 'Your Workspace'
@@ -58,16 +103,28 @@ function SetupPageContent() {
     }
   };
 
-  const loadChannels = async () => {
+  const loadChannels = async ({ query = '', cursor = null, refresh = false }: { query?: string; cursor?: string | null; refresh?: boolean } = {}) => {
     try {
-      setStatus({ type: 'loading', message: 'Loading channels...' });
+      if (cursor) {
+        setLoadingMore(true);
+      } else {
+        setStatus({ type: 'loading', message: 'Loading channels...' });
+      }
       
-      const response = await fetch(`${backendUrl}/api/channels/${workspaceId}`);
-      const data = await response.json();
+      const params = new URLSearchParams({ limit: String(CHANNEL_PAGE_SIZE) });
+      if (query) params.set('q', query);
+      if (cursor) params.set('cursor', cursor);
+      if (refresh) params.set('refresh', '1');
+      
+      const response = await fetch(`${backendUrl}/api/channels/${workspaceId}?${params}`);
+      const data: ChannelPage = await response.json();
+      if (query !== channelQueryRef.current) return;
       
       if (response.ok && data.channels) {
-        setChannels(data.channels);
-        setStatus({ type: null, message: '' });
+        setChannels(prev => cursor ? [...prev, ...data.channels] : data.channels);
+        setNextCursor(data.next_cursor);
+        setTotalChannels(data.total);
+        if (!cursor) setStatus({ type: null, message: '' });
       } else {
         setStatus({ type: 'error', message: `Error loading channels: ${data.error || 'Unknown error'}` });
       }
@@ -76,28 +133,13 @@ function SetupPageContent() {
       setStatus({ type: 'error', message: 'Error loading channels. Please try again.' });
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
-  const loadChannelPreferences = async () => {
-    try {
-      const response = await fetch(`${backendUrl}/api/workspace/${workspaceId}/channel`);
-      if (response.ok) {
-        const data = await response.json();
-        if (data.selected_channel) {
-          setSelectedChannel(data.selected_channel.id);
-          // Load existing preferences if available
-          if (data.selected_channel.standup_time) {
-            setStandupTime(data.selected_channel.standup_time);
-          }
-          if (data.selected_channel.timezone) {
-            setTimezone(data.selected_channel.timezone);
-          }
-        }
-      }
-    } catch (error) {
-      console.error('Error loading channel preferences:', error);
-    }
+  const handleSelectChannel = (channelId: string) => {
+    setSelectedChannel(channelId);
+    setSelectedChannelName(channels.find(ch => ch.id === channelId)?.name || '');
   };
 
   const handleSaveChannel = async () => {
@@ -120,8 +162,6 @@ function SetupPageContent() {
       setSaving(true);
       setStatus({ type: 'loading', message: 'Saving channel selection...' });
       
-      const selectedChannelData = channels.find(ch => ch.id === selectedChannel);
-      
       const response = await fetch(`${backendUrl}/api/channels/${workspaceId}`, {
         method: 'POST',
         headers: {
@@ -129,7 +169,7 @@ function SetupPageContent() {
         },
         body: JSON.stringify({
           channel_id: selectedChannel,
-          channel_name: selectedChannelData?.name || selectedChannel,
+          channel_name: selectedChannelName || selectedChannel,
           standup_time: standupTime,
           timezone: timezone
         })
@@ -182,22 +222,57 @@ function SetupPageContent() {
               <label htmlFor="channel-select" className="block text-sm font-medium text-gray-700 mb-2">
                 Select Channel for Standup Summaries
               </label>
+              <div className="flex gap-2 mb-2">
+                <input
+                  type="search"
+                  value={channelQuery}
+                  onChange={(e) => setChannelQuery(e.target.value)}
+                  placeholder="Search channels by name..."
+                  className="flex-1 p-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500"
+                />
+                <button
+                  type="button"
+                  onClick={() => loadChannels({ query: channelQuery, refresh: true })}
+                  disabled={loading}
+                  className="px-4 border border-gray-300 rounded-lg text-sm text-gray-700 hover:bg-gray-50 disabled:bg-gray-100"
+                >
+                  Refresh
+                </button>
+              </div>
               <select
                 id="channel-select"
                 value={selectedChannel}
-                onChange={(e) => setSelectedChannel(e.target.value)}
+                onChange={(e) => handleSelectChannel(e.target.value)}
                 disabled={loading}
                 className="w-full p-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 disabled:bg-gray-100"
               >
                 <option value="">
                   {loading ? 'Loading channels...' : 'Select a channel...'}
                 </option>
+                {selectedChannel && !channels.some(ch => ch.id === selectedChannel) && (
+                  <option value={selectedChannel}>#{selectedChannelName || selectedChannel}</option>
+                )}
                 {channels.map((channel) => (
                   <option key={channel.id} value={channel.id}>
                     #{channel.name}{channel.is_private ? ' (private)' : ''}
                   </option>
                 ))}
               </select>
+              <div className="flex items-center justify-between mt-1">
+                <p className="text-sm text-gray-500">
+                  Showing {channels.length} of {totalChannels} channels
+                </p>
+                {nextCursor && (
+                  <button
+                    type="button"
+                    onClick={() => loadChannels({ query: channelQuery, cursor: nextCursor })}
+                    disabled={loadingMore}
+                    className="text-sm text-blue-600 hover:text-blue-800 disabled:text-gray-400"
+                  >
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                )}
+              </div>
             </div>
 
             {/* Standup Time Selection */}
@@ -272,7 +347,7 @@ function SetupPageContent() {
                 </p>
                 <div className="bg-white p-3 rounded border border-yellow-300">
                   <p className="text-sm font-mono text-gray-800">
-                    Go to <strong>#{channels.find(ch => ch.id === selectedChannel)?.name}</strong> in Slack and type:
+                    Go to <strong>#{selectedChannelName}</strong> in Slack and type:
                   </p>
                   <div className="mt-2 p-2 bg-gray-100 rounded font-mono text-sm">
                     /invite @your-bot-name
@@ -1,8 +1,15 @@
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_process_shutdown, task_prerun, task_postrun
+from common.metrics import CELERY_TASK_SECONDS, start_metrics_server, mark_process_dead, clear_multiproc_dir
+from common.tracing import init_tracing
+from common.profiling import maybe_start
 import os
+import time
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://standup-redis:6379/0")
+HISTORY_ROLLUP_HOUR_UTC = int(os.getenv("HISTORY_ROLLUP_HOUR_UTC", "2"))
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
 
 celery = Celery(
     "standup",
@@ -12,10 +19,45 @@ celery = Celery(
 
 celery.conf.timezone = "UTC"
 
+init_tracing("standup-scheduler")
+
 celery.conf.beat_scheduler = "redbeat.RedBeatScheduler"
 celery.conf.redbeat_redis_url = REDIS_URL
 
-celery.conf.redbeat_lock_key = None  
+# RedBeat's beat lock: only the beat instance holding it fires entries, so a
+# second beat (rolling deploy, extra replica) waits as a standby instead of
+# double-firing standup_<workspace_id>. Timeout defaults to 5x the loop interval.
+celery.conf.redbeat_lock_key = "redbeat::lock"
+
+# Metrics: /metrics on WORKER_METRICS_PORT. Set PROMETHEUS_MULTIPROC_DIR so
+# samples from prefork children are aggregated into the parent's endpoint.
+_task_started = {}
+_task_profiles = {}
+
+@worker_init.connect
+def _start_worker_metrics(**kwargs):
+    clear_multiproc_dir()
+    start_metrics_server(WORKER_METRICS_PORT)
+
+@worker_process_shutdown.connect
+def _worker_process_shutdown(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+@task_prerun.connect
+def _task_prerun(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+    profile = maybe_start(task.name if task else "task")
+    if profile is not None:
+        _task_profiles[task_id] = profile
+
+@task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_SECONDS.labels(task=task.name, state=state or "UNKNOWN").observe(time.perf_counter() - started)
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        profile.stop()
 
 import tasks
 
@@ -23,5 +65,9 @@ celery.conf.beat_schedule = {
     "refresh-every-2-mins": {
         "task": "tasks.refresh_schedules",
         "schedule": crontab(minute="*/2"),
+    },
+    "rollup-standup-history-nightly": {
+        "task": "tasks.rollup_standup_history",
+        "schedule": crontab(hour=HISTORY_ROLLUP_HOUR_UTC, minute=0),
     }
 }
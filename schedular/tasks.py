@@ -1,15 +1,18 @@
 from celery_app import celery
 from celery.schedules import crontab
 from redbeat import RedBeatSchedulerEntry
-from pymongo import MongoClient
-from datetime import datetime, timezone
+from common.mongo import db
+from common.retention import ensure_retention_indexes, rollup_closed_runs
+from common.tracing import span, inject_context
+from common.sharding import shard_for
+from datetime import datetime, timezone, timedelta
 import pytz
 import requests
 import os
 
 LANGGRAPH_SERVICE_URL = os.getenv("LANGGRAPH_SERVICE_URL")
-client = MongoClient(os.getenv("MONGODB_URI"))
-db = client["standup"]
+# Open missing DMs this many minutes before each standup (0 disables)
+DM_PREWARM_LEAD_MINUTES = int(os.getenv("DM_PREWARM_LEAD_MINUTES", "10"))
 
 @celery.task
 def refresh_schedules():
@@ -51,23 +54,63 @@ def refresh_schedules():
         entry.save()
         schedule_count += 1
 
+        if DM_PREWARM_LEAD_MINUTES > 0:
+            prewarm_dt = utc_dt - timedelta(minutes=DM_PREWARM_LEAD_MINUTES)
+            RedBeatSchedulerEntry(
+                name=f"prewarm_{workspace_id}",
+                task="tasks.prewarm_dms_task",
+                schedule=crontab(hour=prewarm_dt.hour, minute=prewarm_dt.minute),
+                args=(workspace_id,),
+                app=celery
+            ).save()
+
     print(f"✅ Total schedules loaded: {schedule_count}")
 
 @celery.task
 def start_standup_task(workspace_id, channel_id=None):
     print(f"🚀 Starting standup task for workspace: {workspace_id}")
     payload = {"workspace_id": workspace_id, "channel_id": channel_id}
-    r = requests.post(f"{LANGGRAPH_SERVICE_URL}/start", json=payload)
+    # Root span of the run's trace; its context rides along to /start and the resume task
+    # The owning replica keeps the run's graph checkpoint, so the resume must go back to it
+    service_url = shard_for(workspace_id, default=LANGGRAPH_SERVICE_URL)
+    with span("celery.start_standup_task", workspace_id=workspace_id):
+        r = requests.post(f"{service_url}/start", json=payload, headers=inject_context())
+
+        if r.ok:
+            thread_id = r.json().get("thread_id")
+            # An attached start joined today's run, which already has its resume scheduled
+            if thread_id and not r.json().get("attached"):
+                resume_standup_task.apply_async(
+                    args=[thread_id],
+                    kwargs={"trace_context": inject_context(), "service_url": service_url},
+                    countdown=120
+                )
+            return r.json()
+        else:
+            return {"error": r.text}
+
+@celery.task
+def prewarm_dms_task(workspace_id):
+    """Have the owning replica open missing DMs so kickoff is one chat_postMessage per user.
 
-    if r.ok:
-        thread_id = r.json().get("thread_id")
-        if thread_id:
-            resume_standup_task.apply_async(args=[thread_id], countdown=120)
-        return r.json()
-    else:
-        return {"error": r.text}
+    The server accepts the warm-up (202) and runs it in the background.
+    """
+    service_url = shard_for(workspace_id, default=LANGGRAPH_SERVICE_URL)
+    with span("celery.prewarm_dms_task", workspace_id=workspace_id):
+        r = requests.post(f"{service_url}/prewarm", json={"workspace_id": workspace_id},
+                          headers=inject_context(), timeout=30)
+    return r.json() if r.ok else {"error": r.text}
 
 @celery.task
-def resume_standup_task(thread_id):
-    r = requests.post(f"{LANGGRAPH_SERVICE_URL}/resume", json={"thread_id": thread_id})
+def resume_standup_task(thread_id, trace_context=None, service_url=None):
+    with span("celery.resume_standup_task", carrier=trace_context or {}, thread_id=thread_id):
+        r = requests.post(f"{service_url or LANGGRAPH_SERVICE_URL}/resume", json={"thread_id": thread_id}, headers=inject_context())
     return r.json()
+
+@celery.task
+def rollup_standup_history():
+    print("🧹 Rolling up closed standup runs...")
+    ensure_retention_indexes()
+    count = rollup_closed_runs()
+    print(f"✅ Rolled up {count} standup runs into history")
+    return {"rolled_up": count}
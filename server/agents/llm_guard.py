@@ -0,0 +1,107 @@
+# Bulkhead + circuit breaker for LLM calls, so a slow provider can't stall resumes
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from common.metrics import LLM_BREAKER_TRANSITIONS_TOTAL
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Hard upper bound per call, including time spent queued for a pool slot
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "30"))
+# Calls slower than this succeed but count against the breaker
+LLM_LATENCY_BUDGET_SECONDS = float(os.getenv("LLM_LATENCY_BUDGET_SECONDS", "15"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+class CircuitOpenError(Exception):
+	pass
+
+class CircuitBreaker:
+	"""closed -> open after N consecutive failures -> half_open after a cooldown,
+	where a single probe call decides between closed and open again."""
+
+	def __init__(self, failure_threshold, reset_seconds):
+		self.failure_threshold = failure_threshold
+		self.reset_seconds = reset_seconds
+		self.state = "closed"
+		self.failures = 0
+		self.opened_at = 0.0
+		self.probing = False
+		self._lock = threading.Lock()
+
+	def _set_state(self, state):
+		if state != self.state:
+			self.state = state
+			LLM_BREAKER_TRANSITIONS_TOTAL.labels(state=state).inc()
+			print(f"🔌 LLM circuit breaker {state}")
+
+	def allow(self):
+		with self._lock:
+			if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+				self._set_state("half_open")
+				self.probing = False
+			if self.state == "closed":
+				return True
+			if self.state == "half_open" and not self.probing:
+				self.probing = True
+				return True
+			return False
+
+	def record_success(self):
+		with self._lock:
+			self.failures = 0
+			self.probing = False
+			self._set_state("closed")
+
+	def record_failure(self):
+		with self._lock:
+			self.failures += 1
+			self.probing = False
+			if self.state == "half_open" or self.failures >= self.failure_threshold:
+				self.opened_at = time.monotonic()
+				self._set_state("open")
+
+	def release(self):
+		"""Give back a probe slot without a verdict (caller was cancelled)"""
+		with self._lock:
+			self.probing = False
+
+breaker = CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+	# Per process: worker threads don't survive a fork
+	global _pool, _pool_pid
+	with _pool_lock:
+		if _pool is None or _pool_pid != os.getpid():
+			_pool = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+			_pool_pid = os.getpid()
+		return _pool
+
+async def call_llm(fn, *args):
+	"""Run a blocking LLM call in the bulkhead pool, guarded by the deadline and breaker.
+
+	Raises CircuitOpenError without calling the provider while the breaker is
+	open, and asyncio.TimeoutError once LLM_CALL_TIMEOUT_SECONDS have passed.
+	"""
+	if not breaker.allow():
+		raise CircuitOpenError("LLM circuit breaker is open")
+	start = time.perf_counter()
+	try:
+		# Cancelling on timeout also drops the call if it is still queued for a slot
+		result = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(_get_pool(), fn, *args), LLM_CALL_TIMEOUT_SECONDS)
+	except asyncio.CancelledError:
+		breaker.release()
+		raise
+	except Exception:
+		breaker.record_failure()
+		raise
+	if time.perf_counter() - start > LLM_LATENCY_BUDGET_SECONDS:
+		breaker.record_failure()
+	else:
+		breaker.record_success()
+	return result
@@ -0,0 +1,151 @@
+# Shrink standup replies before they go into the summary prompt
+import os
+import re
+import html
+from common.retention import is_blocker
+
+SUMMARY_MAX_REPLY_CHARS = int(os.getenv("SUMMARY_MAX_REPLY_CHARS", "800"))
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "4000"))
+# Rough size of an English token; close enough to budget without a tokenizer dependency
+CHARS_PER_TOKEN = 4
+MIN_REPLY_CHARS = 40
+
+_CODE_BLOCK = re.compile(r"```.*?```", re.DOTALL)
+_LABELLED_LINK = re.compile(r"<(?:https?|mailto):[^|>]+\|([^>]+)>")
+_LINK = re.compile(r"<(?:https?|mailto):[^>]+>|https?://\S+")
+_CHANNEL = re.compile(r"<#C\w+\|([^>]*)>")
+_USER = re.compile(r"<@([UW]\w+)\|[^>]*>")
+_SPECIAL = re.compile(r"<!(here|channel|everyone)[^>]*>")
+_SUBTEAM = re.compile(r"<!subteam\^\w+(?:\|([^>]*))?>")
+# A run of :shortcodes: (":wave::skin-tone-2:") with a letter in each, or :+1: / :-1:.
+# Word or colon characters on either side mean times, ratios or ports ("10:30:45", "1:2:3").
+_EMOJI_CODE = re.compile(r"(?<![\w:])(?::(?:[a-z0-9_+\-']*[a-z_][a-z0-9_+\-']*|[+\-]1):)+(?![\w:])")
+_EMOJI = re.compile("[\U0001F1E6-\U0001F1FF\U0001F300-\U0001FAFF\u2600-\u27BF\uFE0F\u200D]")
+_SPACES = re.compile(r"[ \t]+")
+_NEWLINES = re.compile(r"\s*\n\s*")
+
+def estimate_tokens(text):
+	return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def strip_slack_markup(text):
+	"""Plain text from Slack mrkdwn: links to labels, emoji and pasted code blocks dropped"""
+	text = _CODE_BLOCK.sub("[code]", text)
+	text = _LABELLED_LINK.sub(r"\1", text)
+	text = _LINK.sub("[link]", text)
+	text = _CHANNEL.sub(r"#\1", text)
+	text = _USER.sub(r"<@\1>", text)
+	text = _SPECIAL.sub(r"@\1", text)
+	text = _SUBTEAM.sub(lambda m: f"@{m.group(1) or 'team'}", text)
+	text = _EMOJI_CODE.sub("", text)
+	text = _EMOJI.sub("", text)
+	return html.unescape(text)
+
+def normalize_reply(text):
+	# One line per reply: fallback_summary and the prompt both work line by line
+	text = strip_slack_markup(text or "")
+	text = _SPACES.sub(" ", text)
+	return _NEWLINES.sub(" / ", text).strip(" /")
+
+def _truncate(text, limit):
+	return text if len(text) <= limit else text[:max(limit - 1, 0)].rstrip() + "…"
+
+def _line_chars(user, text):
+	return len(f"- <@{user}>: {text}\n")
+
+def _share_budget(lines, budget_chars):
+	"""Equal share of the budget per line; what short lines leave unused goes to the long ones"""
+	prefixes = [_line_chars(user, "") for user, _ in lines]
+	remaining = budget_chars - sum(prefixes)
+	order = sorted(range(len(lines)), key=lambda i: len(lines[i][1]))
+	fitted = list(lines)
+	for n, i in enumerate(order):
+		user, text = lines[i]
+		share = max(remaining // (len(order) - n), MIN_REPLY_CHARS)
+		fitted[i] = (user, _truncate(text, share))
+		remaining -= len(fitted[i][1])
+	return fitted
+
+def _spread(items, k):
+	"""k items evenly spaced through items, in order"""
+	return [items[j * len(items) // k] for j in range(k)]
+
+def _fit_budget(lines, budget_chars):
+	"""Truncate lines to fit the budget; drop lines when MIN_REPLY_CHARS each is still too much.
+
+	Dropping keeps blockers first, then an even sample of the other lines,
+	in their original order. Returns the lines that stay.
+	"""
+	fitted = _share_budget(lines, budget_chars)
+	if sum(_line_chars(u, t) for u, t in fitted) <= budget_chars:
+		return fitted
+	floor = [_line_chars(u, _truncate(t, MIN_REPLY_CHARS)) for u, t in lines]
+	kept, used = [], 0
+	for i in (i for i, (_, t) in enumerate(lines) if is_blocker(t)):
+		if used + floor[i] <= budget_chars:
+			kept.append(i)
+			used += floor[i]
+	taken = set(kept)
+	others = [i for i in range(len(lines)) if i not in taken]
+	# Largest even sample of the rest that still fits at the floor
+	lo, hi = 0, len(others)
+	while lo < hi:
+		mid = (lo + hi + 1) // 2
+		if used + sum(floor[i] for i in _spread(others, mid)) <= budget_chars:
+			lo = mid
+		else:
+			hi = mid - 1
+	kept = sorted(kept + _spread(others, lo))
+	return _share_budget([lines[i] for i in kept], budget_chars)
+
+def compact_responses(responses, max_reply_chars=SUMMARY_MAX_REPLY_CHARS, token_budget=SUMMARY_TOKEN_BUDGET):
+	"""Build the "- <@user>: text" lines for a run's responses, compacted.
+
+	Returns (assembled, stats) where stats counts tokens before and after,
+	empty and duplicate replies dropped, users whose text was truncated and
+	users dropped to fit token_budget, and says whether the budget was met.
+	"""
+	raw = "\n".join(f"- <@{r['user_id']}>: {r.get('text') or ''}" for r in responses)
+	per_user = {}
+	seen = set()
+	truncated_users = set()
+	duplicates = 0
+	empty = 0
+	for r in responses:
+		text = normalize_reply(r.get("text"))
+		if not text:
+			empty += 1
+			continue
+		key = (r["user_id"], text.casefold())
+		if key in seen:
+			duplicates += 1
+			continue
+		seen.add(key)
+		if len(text) > max_reply_chars:
+			truncated_users.add(r["user_id"])
+			text = _truncate(text, max_reply_chars)
+		per_user.setdefault(r["user_id"], []).append(text)
+
+	# One line per user: repeated "- <@U…>:" prefixes are tokens too
+	lines = [(user, " / ".join(texts)) for user, texts in per_user.items()]
+	budget_chars = token_budget * CHARS_PER_TOKEN
+	dropped = 0
+	if sum(_line_chars(u, t) for u, t in lines) > budget_chars:
+		before = dict(lines)
+		fitted = _fit_budget(lines, budget_chars)
+		dropped = len(lines) - len(fitted)
+		truncated_users.update(u for u, t in fitted if t != before[u])
+		lines = fitted
+
+	assembled = "\n".join(f"- <@{user}>: {text}" for user, text in lines)
+	stats = {
+		"responses": len(responses),
+		"users": len(lines),
+		"empty_dropped": empty,
+		"duplicates_dropped": duplicates,
+		"truncated": len(truncated_users),
+		"users_dropped": dropped,
+		"tokens_before": estimate_tokens(raw),
+		"tokens_after": estimate_tokens(assembled),
+		"budget_met": estimate_tokens(assembled) <= token_budget,
+	}
+	return assembled, stats
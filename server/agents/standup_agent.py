@@ -1,17 +1,32 @@
 # Core LangGraph agent logic
-from db.models import get_users, create_standup_run
-from slack.slack_client import send_dm_with_cache
+from db.async_models import get_users, create_standup_run, delete_standup_run
+from db.run_lock import bind_run_lock, abandon_run
+from slack.slack_client import send_dm_with_cache, get_client_for_workspace
 
-async def collect_standups(workspace_id):
+async def collect_standups(workspace_id, run_lock=None, owner=None):
 	"""
 	Initiates a standup by creating a run and DMing every user.
-	Returns run_id.
+	With run_lock, the run is bound to the day's lock (held by owner) before any DM goes out;
+	if none of the DMs can be delivered, the run and the lock are given back so a retry starts over.
+	Returns {"run_id", "invited_count", "dm_failures"}.
 	"""
-	run_id = create_standup_run(workspace_id, created_by="system")
-	users = get_users(workspace_id)
+	# One client and the user docs below: a pre-warmed user is a single chat_postMessage.
+	# Built first, so a missing workspace or token fails before a run exists.
+	client = await get_client_for_workspace(workspace_id)
+	users = await get_users(workspace_id)
+	run_id = await create_standup_run(workspace_id, created_by="system", invited_count=len(users))
+	if run_lock and not await bind_run_lock(run_lock, owner, run_id):
+		# Our lease ran out and another start took the day over; it does the fan-out
+		await delete_standup_run(run_id)
+		raise RuntimeError(f"Run lock {run_lock} was taken over before run {run_id} started")
+	dm_failures = 0
 	for u in users:
 		try:
-			await send_dm_with_cache(workspace_id, u["user_id"], "Good morning! Please reply with your standup: (Yesterday / Today / Blockers)")
+			await send_dm_with_cache(workspace_id, u["user_id"], "Good morning! Please reply with your standup: (Yesterday / Today / Blockers)", client=client, user=u)
 		except Exception as e:
+			dm_failures += 1
 			print("Error DMing user:", u["user_id"], e)
-	return run_id
+	if run_lock and users and dm_failures == len(users):
+		await abandon_run(run_lock, owner, run_id)
+		raise RuntimeError(f"No standup DMs could be delivered for {workspace_id}; run {run_id} abandoned")
+	return {"run_id": run_id, "invited_count": len(users), "dm_failures": dm_failures}
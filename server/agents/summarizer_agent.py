@@ -1,11 +1,18 @@
 # Summarization part
-from db.models import get_responses_for_run, close_standup_run
+from db.async_models import get_responses_for_run, close_standup_run
 from slack.slack_client import post_message_to_channel
 from dotenv import load_dotenv
 import os
-from langchain_openai import ChatOpenAI
+import time
+import asyncio
+from common.retention import is_blocker
+from common.metrics import LLM_CALL_SECONDS, LLM_FALLBACKS_TOTAL, LLM_PROMPT_TOKENS_TOTAL
+from agents.prompt_compaction import compact_responses
+from agents.llm_guard import call_llm, CircuitOpenError, LLM_CALL_TIMEOUT_SECONDS
+from common.tracing import span
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+LLM_MODEL = "gpt-4o-mini"
 
 async def summarize_standups(workspace_id, run_id, channel_id=None):
 	"""
@@ -15,32 +22,55 @@ async def summarize_standups(workspace_id, run_id, channel_id=None):
 		workspace_id: The Slack workspace ID
 		run_id: The standup run ID
 		channel_id: Optional channel ID to post summary to (e.g., "#general" or "C1234567890")
+
+	Returns {"summary", "response_count"}. The summary is also stored on the run.
 	"""
 	print(f"Summarizing standups for run {run_id}")
-	responses = get_responses_for_run(workspace_id, run_id)
-	if not responses:
+	responses = await get_responses_for_run(workspace_id, run_id)
+	assembled, stats = compact_responses(responses)
+	if responses:
+		budget = "met" if stats["budget_met"] else "exceeded"
+		LLM_PROMPT_TOKENS_TOTAL.labels(stage="raw", budget=budget).inc(stats["tokens_before"])
+		LLM_PROMPT_TOKENS_TOTAL.labels(stage="compacted", budget=budget).inc(stats["tokens_after"])
+		print(f"Prompt compacted: ~{stats['tokens_before']} -> ~{stats['tokens_after']} tokens "
+			f"({stats['duplicates_dropped']} duplicates and {stats['empty_dropped']} empty replies dropped, "
+			f"{stats['truncated']} users truncated, {stats['users_dropped']} users dropped to fit the budget)")
+		if not stats["budget_met"]:
+			print(f"⚠️ Summary prompt is over budget: ~{stats['tokens_after']} tokens")
+	if not stats["users"]:
+		# Nothing left after compaction (empty or emoji-only replies): don't let the LLM invent updates
 		print("No responses collected.")
 		summary = "No responses collected."
 	else:
-		assembled = "\n".join([f"- <@{r['user_id']}>: {r['text']}" for r in responses])
-
 		if OPENAI_API_KEY:
+			start = time.perf_counter()
 			try:
-				llm = ChatOpenAI(model="gpt-4o-mini", api_key=OPENAI_API_KEY)
 				print(f"Using OpenAI API")
 				prompt = f"Summarize these standup updates grouped by person and extract blockers:\n\n{assembled}\n\nReturn a short summary and then a Blockers section."
-				# If you switch to the async OpenAI client, update this await accordingly
-				resp = llm.invoke([{"role": "user", "content": prompt}])
-				summary = resp.content
+				with span("llm.summarize", model=LLM_MODEL, responses=len(responses),
+						prompt_tokens_raw=stats["tokens_before"], prompt_tokens=stats["tokens_after"]):
+					summary = await call_llm(_invoke_llm, prompt)
+				LLM_CALL_SECONDS.labels(model=LLM_MODEL, outcome="ok").observe(time.perf_counter() - start)
+			except CircuitOpenError:
+				print("LLM circuit breaker open, using fallback summary")
+				LLM_FALLBACKS_TOTAL.labels(reason="circuit_open").inc()
+				summary = fallback_summary(assembled)
+			except asyncio.TimeoutError:
+				LLM_CALL_SECONDS.labels(model=LLM_MODEL, outcome="timeout").observe(time.perf_counter() - start)
+				print(f"OpenAI call exceeded {LLM_CALL_TIMEOUT_SECONDS}s, using fallback summary")
+				LLM_FALLBACKS_TOTAL.labels(reason="timeout").inc()
+				summary = fallback_summary(assembled)
 			except Exception as e:
+				LLM_CALL_SECONDS.labels(model=LLM_MODEL, outcome="error").observe(time.perf_counter() - start)
 				print("OpenAI error:", e)
+				LLM_FALLBACKS_TOTAL.labels(reason="error").inc()
 				summary = fallback_summary(assembled)
 		else:
 			print("No OpenAI API key found, using fallback summary")
 			summary = fallback_summary(assembled)
 
 	# close the run
-	close_standup_run(run_id)
+	await close_standup_run(run_id, summary=summary)
 	
 	# Post summary to channel if specified
 	if channel_id:
@@ -51,10 +81,18 @@ async def summarize_standups(workspace_id, run_id, channel_id=None):
 		except Exception as e:
 			print(f"❌ Error posting summary to channel: {e}")
 	
-	return summary
+	return {"summary": summary, "response_count": len(responses)}
+
+def _invoke_llm(prompt):
+	"""Blocking OpenAI round-trip; call_llm runs it in the LLM pool, never on the shared event loop"""
+	# Imported on first use: langchain_openai is the slowest import in the server
+	from langchain_openai import ChatOpenAI
+	# No client retries: the deadline and circuit breaker in llm_guard decide
+	llm = ChatOpenAI(model=LLM_MODEL, api_key=OPENAI_API_KEY, timeout=LLM_CALL_TIMEOUT_SECONDS, max_retries=0)
+	return llm.invoke([{"role": "user", "content": prompt}]).content
 
 def fallback_summary(assembled_text):
-	# Very small heuristic summarizer: group lines and detect 'block' keywords
+	# Very small heuristic summarizer: group lines and pick out the ones reporting a blocker
 	lines = assembled_text.splitlines()
 	persons = {}
 	blockers = []
@@ -66,8 +104,7 @@ def fallback_summary(assembled_text):
 			except ValueError:
 				continue
 			persons.setdefault(user, []).append(text)
-			lower = text.lower()
-			if "block" in lower or "blocked" in lower or "stuck" in lower or "waiting" in lower:
+			if is_blocker(text):
 				blockers.append(f"{user}: {text}")
 	summary_lines = ["**Standup Summary**"]
 	for u, texts in persons.items():
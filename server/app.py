@@ -1,19 +1,57 @@
-from flask import Flask, request, jsonify, redirect
+from flask import Flask, request, jsonify, redirect, Response
+import os
+import threading
 from flask_cors import CORS
+from slack_sdk.errors import SlackApiError
 from dotenv import load_dotenv
-from db.models import get_workspace_by_id, get_all_workspaces, update_channel_preference, get_channel_preference
-from slack_sdk.web.client import WebClient
+from db.models import get_workspace_by_id, get_workspaces_page, get_workspace_setup, update_channel_preference, get_channel_preference, get_standup_history
+from datetime import datetime
+from db.mongo import get_pool_metrics
+from common.metrics import render_metrics
+from common.tracing import init_tracing, span
+from opentelemetry.trace import SpanKind
+from db.analytics import get_workspace_trends, get_user_trends, get_user_rollup
 
 load_dotenv()
 
 from slack.oauth import install_url, oauth_callback
 from slack.event_handler import handle_event, verify_slack_request
-from graph import start_standup_endpoint, resume_standup_endpoint
-import asyncio
+from slack.channels import get_cached_channels, invalidate_channels, page_channels
+from async_runner import run_async, submit_async, LOOP_THREAD_NAME
+from common.profiling import profiled
+from common.sharding import owns, shard_for
+import requests
+
+init_tracing("standup-server")
+
+# graph pulls in LangGraph/LangChain (~1s). It is imported on first use by
+# /start and /resume; the preload thread does that off the request path so
+# the server can ack /slack/events immediately after boot.
+PRELOAD_GRAPH = os.getenv("PRELOAD_GRAPH", "1") == "1"
+
+def _preload_graph():
+    import graph  # noqa: F401
+
+if PRELOAD_GRAPH:
+    threading.Thread(target=_preload_graph, name="preload-graph", daemon=True).start()
 
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3000", "http://standup-frontend:3000"], supports_credentials=True)
 
+def conditional_json(payload):
+    """JSON response with an ETag; answers 304 Not Modified when If-None-Match matches.
+
+    no-cache makes browsers revalidate on every render, so unchanged data
+    costs a 304 with no body instead of a full response.
+    """
+    response = jsonify(payload)
+    response.add_etag()
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+def _page_limit(default=100, maximum=1000):
+    return max(1, min(request.args.get("limit", default, type=int), maximum))
+
 @app.route("/slack/install", methods=["GET"])
 def install():
     return redirect(install_url())
@@ -23,6 +61,22 @@ def oauth_cb():
     code = request.args.get("code")
     return oauth_callback(code)
 
+FORWARDED_HEADER = "X-Standup-Forwarded"
+SHARD_FORWARD_TIMEOUT_SECONDS = float(os.getenv("SHARD_FORWARD_TIMEOUT_SECONDS", "2"))
+
+def _forward_event(owner):
+    """Replay the signed request to its owner; None means handle it here instead"""
+    headers = {k: v for k, v in request.headers.items() if k.lower().startswith("x-slack-") or k.lower() == "content-type"}
+    headers[FORWARDED_HEADER] = "1"
+    try:
+        r = requests.post(f"{owner}/slack/events", data=request.get_data(), headers=headers, timeout=SHARD_FORWARD_TIMEOUT_SECONDS)
+        if r.status_code < 500:
+            return Response(r.content, status=r.status_code, content_type=r.headers.get("Content-Type"))
+        print(f"⚠️ Shard {owner} answered {r.status_code}; handling event locally")
+    except requests.RequestException as e:
+        print(f"⚠️ Could not forward event to shard {owner}: {e}; handling it locally")
+    return None
+
 @app.route("/slack/events", methods=["POST"])
 def slack_events():
     # verify signature
@@ -34,12 +88,22 @@ def slack_events():
     if payload.get("type") == "url_verification":
         return jsonify({"challenge": payload.get("challenge")})
 
+    # With SERVER_SHARDS set, hand the event to the replica that owns the workspace
+    if not request.headers.get(FORWARDED_HEADER) and not owns(payload.get("team_id")):
+        forwarded = _forward_event(shard_for(payload.get("team_id")))
+        if forwarded is not None:
+            return forwarded
+
     # handle regular events
-    return handle_event(payload)
+    with profiled("slack_events"):
+        return handle_event(payload)
 
 @app.route("/api/channels/<workspace_id>", methods=["GET"])
 def get_channels(workspace_id):
-    """Get available channels for a workspace"""
+    """Get available channels for a workspace, one page at a time.
+
+    Query params: q (name prefix), cursor, limit (max 1000), refresh=1 to bypass the cache.
+    """
     workspace = get_workspace_by_id(workspace_id)
     if not workspace:
         return jsonify({"error": "workspace not found"}), 404
@@ -48,27 +112,21 @@ def get_channels(workspace_id):
     if not bot_token:
         return jsonify({"error": "bot token not found"}), 400
     
+    prefix = request.args.get("q", "")
+    cursor = request.args.get("cursor")
+    limit = _page_limit()
+    refresh = request.args.get("refresh") in ("1", "true")
+    if cursor and not cursor.isdigit():
+        return jsonify({"error": "invalid cursor"}), 400
+    
     try:
-        # Use Slack SDK instead of direct HTTP requests
-        client = WebClient(token=bot_token)
-        response = client.conversations_list(types="public_channel,private_channel")
-        
-        if response.get("ok"):
-            channels = response.get("channels", [])
-            # Filter out channels the bot can't post to
-            available_channels = [
-                {
-                    "id": channel["id"],
-                    "name": channel["name"],
-                    "is_private": channel.get("is_private", False)
-                }
-                for channel in channels
-                if not channel.get("is_archived", False)
-            ]
-            return jsonify({"channels": available_channels})
-        else:
-            return jsonify({"error": response.get("error", "Unknown error")}), 400
-            
+        if refresh:
+            # Invalidate rather than refetch directly, so concurrent refreshes share one Slack walk
+            invalidate_channels(workspace_id)
+        entry = get_cached_channels(workspace_id, bot_token)
+        return conditional_json(page_channels(entry, prefix, cursor, limit))
+    except SlackApiError as e:
+        return jsonify({"error": e.response.get("error", "Unknown error")}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -110,13 +168,77 @@ def get_workspace_channel(workspace_id):
     else:
         selected_channel = None
     
-    return jsonify({"selected_channel": selected_channel})
+    return conditional_json({"selected_channel": selected_channel})
 
+@app.route("/api/workspace/<workspace_id>/setup", methods=["GET"])
+def get_workspace_setup_bootstrap(workspace_id):
+    """Everything the setup page needs in one request: workspace, selected channel and schedule"""
+    setup = get_workspace_setup(workspace_id)
+    if not setup:
+        return jsonify({"error": "workspace not found"}), 404
+    
+    preference = setup["preference"][0] if setup["preference"] else None
+    if preference:
+        selected_channel = {
+            "id": preference["channel_id"],
+            "name": preference.get("channel_name"),
+            "standup_time": preference.get("standup_time"),
+            "timezone": preference.get("timezone")
+        }
+    else:
+        selected_channel = None
+    
+    return conditional_json({
+        "workspace": {"workspace_id": setup["workspace_id"], "workspace_name": setup.get("workspace_name")},
+        "selected_channel": selected_channel
+    })
+
+@app.route("/api/workspace/<workspace_id>/history", methods=["GET"])
+def get_workspace_history(workspace_id):
+    """Get compacted history of past standups for a workspace, newest first.
+
+    Query params: limit (max 365), cursor (next_cursor from the previous page).
+    """
+    limit = _page_limit(default=30, maximum=365)
+    before = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            before = datetime.fromisoformat(cursor)
+        except ValueError:
+            return jsonify({"error": "invalid cursor"}), 400
+    
+    history = get_standup_history(workspace_id, limit + 1, before)
+    next_cursor = history[limit - 1]["created_at"].isoformat() if len(history) > limit else None
+    return conditional_json({"history": history[:limit], "next_cursor": next_cursor})
 
-# List installed workspaces
+# Analytics, read from precomputed daily buckets
+def _analytics_days():
+    return max(1, min(request.args.get("days", 30, type=int), 365))
+
+@app.route("/api/analytics/<workspace_id>", methods=["GET"])
+def workspace_analytics(workspace_id):
+    """Daily participation, response latency and blocker trends for a workspace"""
+    return jsonify({"workspace_id": workspace_id, "buckets": get_workspace_trends(workspace_id, _analytics_days())})
+
+@app.route("/api/analytics/<workspace_id>/users", methods=["GET"])
+def workspace_user_analytics(workspace_id):
+    """Per-user totals over the requested window"""
+    return jsonify({"workspace_id": workspace_id, "users": get_user_rollup(workspace_id, _analytics_days())})
+
+@app.route("/api/analytics/<workspace_id>/users/<user_id>", methods=["GET"])
+def user_analytics(workspace_id, user_id):
+    """Daily trends for a single user"""
+    return jsonify({"workspace_id": workspace_id, "user_id": user_id, "buckets": get_user_trends(workspace_id, user_id, _analytics_days())})
+
+
+# List installed workspaces, one page at a time (limit, cursor)
 @app.route("/workspaces", methods=["GET"])
 def list_workspaces():
-    return jsonify(list(get_all_workspaces()))
+    limit = _page_limit()
+    workspaces = get_workspaces_page(request.args.get("cursor"), limit + 1)
+    next_cursor = workspaces[limit - 1]["workspace_id"] if len(workspaces) > limit else None
+    return conditional_json({"workspaces": workspaces[:limit], "next_cursor": next_cursor})
 
 # Get single workspace
 @app.route("/workspaces/<workspace_id>", methods=["GET"])
@@ -125,7 +247,7 @@ def get_workspace(workspace_id):
     if not workspace:
         return jsonify({"error": "workspace not found"}), 404
     
-    return jsonify({
+    return conditional_json({
         "workspace_id": workspace["workspace_id"],
         "workspace_name": workspace["workspace_name"]
     })
@@ -134,6 +256,17 @@ def get_workspace(workspace_id):
 def index():
     return jsonify({"status": "ok"})
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
+@app.route("/health/mongo", methods=["GET"])
+def mongo_health():
+    """Connection pool checkout wait metrics for this worker process"""
+    return jsonify({"pool": get_pool_metrics()})
+
 # LangGraph endpoints for scheduler integration
 @app.route("/start", methods=["POST"])
 def start_standup():
@@ -146,8 +279,12 @@ def start_standup():
         if not workspace_id:
             return jsonify({"error": "workspace_id is required"}), 400
         
-        # Run the async function
-        result = asyncio.run(start_standup_endpoint(workspace_id, channel_id))
+        from graph import start_standup_endpoint
+
+        # Run the async function, continuing the scheduler's trace
+        with span("POST /start", carrier=request.headers, kind=SpanKind.SERVER, workspace_id=workspace_id), \
+                profiled("start", thread_names=[LOOP_THREAD_NAME]):
+            result = run_async(start_standup_endpoint(workspace_id, channel_id))
         
         if result.get("success"):
             return jsonify(result)
@@ -167,8 +304,12 @@ def resume_standup():
         if not thread_id:
             return jsonify({"error": "thread_id is required"}), 400
         
-        # Run the async function
-        result = asyncio.run(resume_standup_endpoint(thread_id))
+        from graph import resume_standup_endpoint
+
+        # Run the async function, continuing the scheduler's trace
+        with span("POST /resume", carrier=request.headers, kind=SpanKind.SERVER, thread_id=thread_id), \
+                profiled("resume", thread_names=[LOOP_THREAD_NAME]):
+            result = run_async(resume_standup_endpoint(thread_id))
         
         if result.get("success"):
             return jsonify(result)
@@ -178,5 +319,51 @@ def resume_standup():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Workspaces with a warm-up running in this process
+_prewarming = set()
+_prewarming_lock = threading.Lock()
+
+def _prewarm_done(workspace_id, future):
+    with _prewarming_lock:
+        _prewarming.discard(workspace_id)
+    if future.exception() is not None:
+        print(f"❌ DM pre-warm for {workspace_id} failed: {future.exception()}")
+    else:
+        print(f"🔥 DM pre-warm for {workspace_id}: {future.result()}")
+
+@app.route("/prewarm", methods=["POST"])
+def prewarm_dms():
+    """Refresh users and open missing DMs ahead of kickoff - called by scheduler.
+
+    The paced conversations.open loop takes minutes, so it runs in the background
+    on the shared event loop and the request returns 202 right away.
+    """
+    try:
+        data = request.get_json()
+        workspace_id = data.get("workspace_id")
+
+        if not workspace_id:
+            return jsonify({"error": "workspace_id is required"}), 400
+
+        with _prewarming_lock:
+            if workspace_id in _prewarming:
+                return jsonify({"accepted": False, "workspace_id": workspace_id, "reason": "already running"}), 202
+            _prewarming.add(workspace_id)
+
+        from slack.slack_client import prewarm_workspace_dms
+
+        try:
+            with span("POST /prewarm", carrier=request.headers, kind=SpanKind.SERVER, workspace_id=workspace_id):
+                future = submit_async(prewarm_workspace_dms(workspace_id))
+        except Exception:
+            with _prewarming_lock:
+                _prewarming.discard(workspace_id)
+            raise
+        future.add_done_callback(lambda f: _prewarm_done(workspace_id, f))
+        return jsonify({"accepted": True, "workspace_id": workspace_id}), 202
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=4000, debug=True)
@@ -0,0 +1,63 @@
+# Shared event loop for running async graph code from sync Flask handlers
+import asyncio
+import contextvars
+import os
+import threading
+from common.metrics import ASYNC_LOOP_LAG_SECONDS
+
+LOOP_THREAD_NAME = "async-runner"
+LOOP_LAG_INTERVAL_SECONDS = 1.0
+LOOP_LAG_WARN_SECONDS = float(os.getenv("LOOP_LAG_WARN_SECONDS", "0.5"))
+
+_loop = None
+_lock = threading.Lock()
+
+async def _watch_lag():
+    # Every request shares this loop, so one blocking call (sync I/O, a sync
+    # SDK method) stalls all of them; the heartbeat makes that visible
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + LOOP_LAG_INTERVAL_SECONDS
+        await asyncio.sleep(LOOP_LAG_INTERVAL_SECONDS)
+        lag = max(0.0, loop.time() - expected)
+        ASYNC_LOOP_LAG_SECONDS.observe(lag)
+        if lag > LOOP_LAG_WARN_SECONDS:
+            print(f"⚠️ Shared event loop was blocked for {lag:.2f}s")
+
+def _get_loop():
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name=LOOP_THREAD_NAME, daemon=True).start()
+            asyncio.run_coroutine_threadsafe(_watch_lag(), _loop)
+        return _loop
+
+def _reset_after_fork():
+    # The loop thread does not survive a fork; the child starts its own on first use
+    global _loop, _lock
+    _loop = None
+    _lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+async def _run_in_context(coro, context):
+    return await asyncio.get_running_loop().create_task(coro, context=context)
+
+def submit_async(coro):
+    """Start a coroutine on the shared loop without waiting; returns a concurrent.futures.Future"""
+    context = contextvars.copy_context()
+    return asyncio.run_coroutine_threadsafe(_run_in_context(coro, context), _get_loop())
+
+def run_async(coro):
+    """Run a coroutine on the shared loop and block until it finishes.
+
+    Keeping one long-lived loop lets async Mongo / Slack clients reuse their
+    connections across requests instead of reconnecting per asyncio.run().
+    The caller's contextvars (e.g. the active trace span) go with the coroutine.
+    """
+    if threading.current_thread().name == LOOP_THREAD_NAME:
+        # Blocking on the loop from its own thread would deadlock
+        raise RuntimeError("run_async called from the runner loop; await the coroutine instead")
+    context = contextvars.copy_context()
+    return asyncio.run_coroutine_threadsafe(_run_in_context(coro, context), _get_loop()).result()
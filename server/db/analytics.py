@@ -0,0 +1,147 @@
+# Precomputed standup analytics: daily buckets per workspace and per user,
+# maintained incrementally when a run closes so dashboards never scan raw runs/responses.
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from pymongo import UpdateOne
+from common.retention import is_blocker
+from .mongo import db
+
+analytics_col = db["standup_analytics"]
+channel_preferences_col = db["channel_preferences"]
+
+RESPONSE_FIELDS = {"user_id": 1, "text": 1, "created_at": 1}
+
+def local_day(dt, tz_name=None):
+    """YYYY-MM-DD of dt in the workspace's timezone (naive datetimes are UTC); UTC if unknown"""
+    try:
+        tz = ZoneInfo(tz_name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = ZoneInfo("UTC")
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(tz).strftime("%Y-%m-%d")
+
+def build_analytics_updates(run, responses, tz_name=None):
+    """Build the $inc upserts a closed run contributes to its day's buckets.
+
+    Buckets are keyed by the run's day in the workspace's timezone (tz_name),
+    the same day the run lock uses. Workspace buckets have user_id None.
+    Per-user participation is measured against the workspace's run count
+    for the same days.
+    """
+    started_at = run["created_at"]
+    counts = {}
+    blockers = {}
+    first_reply = {}
+    for r in responses:
+        uid = r["user_id"]
+        counts[uid] = counts.get(uid, 0) + 1
+        if is_blocker(r.get("text")):
+            blockers[uid] = blockers.get(uid, 0) + 1
+        created = r.get("created_at")
+        if created and (uid not in first_reply or created < first_reply[uid]):
+            first_reply[uid] = created
+    latencies = {uid: max(0.0, (t - started_at).total_seconds()) for uid, t in first_reply.items()}
+
+    day = local_day(started_at, tz_name)
+    workspace_id = run["workspace_id"]
+    updates = [UpdateOne(
+        {"workspace_id": workspace_id, "user_id": None, "day": day},
+        {"$inc": {
+            "runs": 1,
+            "invited": run.get("invited_count", 0),
+            "responders": len(counts),
+            "responses": len(responses),
+            "blocker_responses": sum(blockers.values()),
+            "latency_seconds_total": sum(latencies.values()),
+            "latency_count": len(latencies),
+        }},
+        upsert=True
+    )]
+    for uid, count in counts.items():
+        updates.append(UpdateOne(
+            {"workspace_id": workspace_id, "user_id": uid, "day": day},
+            {"$inc": {
+                "runs_responded": 1,
+                "responses": count,
+                "blocker_responses": blockers.get(uid, 0),
+                "latency_seconds_total": latencies.get(uid, 0.0),
+                "latency_count": 1 if uid in latencies else 0,
+            }},
+            upsert=True
+        ))
+    return updates
+
+def _workspace_tz(workspace_id):
+    pref = channel_preferences_col.find_one({"workspace_id": workspace_id}, {"timezone": 1})
+    return (pref or {}).get("timezone")
+
+def _since(days, tz_name=None):
+    return local_day(datetime.utcnow() - timedelta(days=days - 1), tz_name)
+
+def _ratio(numerator, denominator):
+    return round(numerator / denominator, 4) if denominator else None
+
+def _workspace_runs_by_day(workspace_id, since):
+    return {
+        b["day"]: b.get("runs", 0)
+        for b in analytics_col.find({"workspace_id": workspace_id, "user_id": None, "day": {"$gte": since}}, {"day": 1, "runs": 1})
+    }
+
+def get_workspace_trends(workspace_id, days=30):
+    buckets = analytics_col.find(
+        {"workspace_id": workspace_id, "user_id": None, "day": {"$gte": _since(days, _workspace_tz(workspace_id))}},
+        {"_id": 0}
+    ).sort("day", 1)
+    return [{
+        "day": b["day"],
+        "runs": b.get("runs", 0),
+        "invited": b.get("invited", 0),
+        "responders": b.get("responders", 0),
+        "responses": b.get("responses", 0),
+        "participation_rate": _ratio(b.get("responders", 0), b.get("invited", 0)),
+        "avg_response_latency_seconds": _ratio(b.get("latency_seconds_total", 0), b.get("latency_count", 0)),
+        "blocker_responses": b.get("blocker_responses", 0),
+        "blocker_rate": _ratio(b.get("blocker_responses", 0), b.get("responses", 0)),
+    } for b in buckets]
+
+def get_user_trends(workspace_id, user_id, days=30):
+    since = _since(days, _workspace_tz(workspace_id))
+    runs_by_day = _workspace_runs_by_day(workspace_id, since)
+    buckets = analytics_col.find(
+        {"workspace_id": workspace_id, "user_id": user_id, "day": {"$gte": since}},
+        {"_id": 0}
+    ).sort("day", 1)
+    return [{
+        "day": b["day"],
+        "runs_responded": b.get("runs_responded", 0),
+        "responses": b.get("responses", 0),
+        "participation_rate": _ratio(b.get("runs_responded", 0), runs_by_day.get(b["day"], 0)),
+        "avg_response_latency_seconds": _ratio(b.get("latency_seconds_total", 0), b.get("latency_count", 0)),
+        "blocker_responses": b.get("blocker_responses", 0),
+    } for b in buckets]
+
+def get_user_rollup(workspace_id, days=30):
+    """Per-user totals over the window, summed from the daily user buckets"""
+    since = _since(days, _workspace_tz(workspace_id))
+    total_runs = sum(_workspace_runs_by_day(workspace_id, since).values())
+    pipeline = [
+        {"$match": {"workspace_id": workspace_id, "user_id": {"$ne": None}, "day": {"$gte": since}}},
+        {"$group": {
+            "_id": "$user_id",
+            "runs_responded": {"$sum": "$runs_responded"},
+            "responses": {"$sum": "$responses"},
+            "blocker_responses": {"$sum": "$blocker_responses"},
+            "latency_seconds_total": {"$sum": "$latency_seconds_total"},
+            "latency_count": {"$sum": "$latency_count"},
+        }},
+        {"$sort": {"runs_responded": -1}},
+    ]
+    return [{
+        "user_id": u["_id"],
+        "runs_responded": u["runs_responded"],
+        "responses": u["responses"],
+        "participation_rate": _ratio(u["runs_responded"], total_runs),
+        "avg_response_latency_seconds": _ratio(u["latency_seconds_total"], u["latency_count"]),
+        "blocker_responses": u["blocker_responses"],
+    } for u in analytics_col.aggregate(pipeline)]
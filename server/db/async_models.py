@@ -0,0 +1,91 @@
+# Async variants of db.models for the graph / Slack hot path.
+# Flask handlers keep using the blocking functions in db.models.
+from .mongo import get_async_db
+from datetime import datetime
+from bson.objectid import ObjectId
+from common.metrics import timed_db
+from common.tracing import inject_context
+from .analytics import build_analytics_updates, RESPONSE_FIELDS
+
+def _col(name):
+    return get_async_db()[name]
+
+# Workspaces
+@timed_db
+async def get_workspace_by_id(workspace_id):
+    return await _col("workspaces").find_one({"workspace_id": workspace_id})
+
+# Channel preferences
+@timed_db
+async def get_channel_preference(workspace_id):
+    """Get the selected channel for a workspace"""
+    return await _col("channel_preferences").find_one({"workspace_id": workspace_id})
+
+# Users
+@timed_db
+async def save_user(workspace_id, user_id, real_name=None, dm_channel_id=None):
+    await _col("users").update_one(
+        {"workspace_id": workspace_id, "user_id": user_id},
+        {"$set": {
+            "real_name": real_name,
+            "dm_channel_id": dm_channel_id,
+            "updated_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+
+@timed_db
+async def get_users(workspace_id):
+    return await _col("users").find({"workspace_id": workspace_id}).to_list(None)
+
+@timed_db
+async def get_user(workspace_id, user_id):
+    return await _col("users").find_one({"workspace_id": workspace_id, "user_id": user_id})
+
+@timed_db
+async def update_user_dm(workspace_id, user_id, dm_channel_id):
+    await _col("users").update_one(
+        {"workspace_id": workspace_id, "user_id": user_id},
+        {"$set": {"dm_channel_id": dm_channel_id, "updated_at": datetime.utcnow()}}
+    )
+
+@timed_db
+async def remove_users(workspace_id, user_ids):
+    """Drop users who left the workspace so they are not DMed at kickoff"""
+    if user_ids:
+        await _col("users").delete_many({"workspace_id": workspace_id, "user_id": {"$in": list(user_ids)}})
+
+# Standup runs & responses
+@timed_db
+async def create_standup_run(workspace_id, created_by="system", invited_count=0):
+    res = await _col("standup_runs").insert_one({
+        "workspace_id": workspace_id,
+        "created_by": created_by,
+        "created_at": datetime.utcnow(),
+        "status": "open",
+        "invited_count": invited_count,
+        "trace_context": inject_context()
+    })
+    return str(res.inserted_id)
+
+@timed_db
+async def delete_standup_run(run_id):
+    """Remove a run that never went out (no DMs), so replies can't attach to it"""
+    await _col("standup_runs").delete_one({"_id": ObjectId(run_id)})
+
+@timed_db
+async def close_standup_run(run_id, summary=None):
+    run = await _col("standup_runs").find_one_and_update(
+        {"_id": ObjectId(run_id), "status": {"$ne": "closed"}},
+        {"$set": {"status": "closed", "closed_at": datetime.utcnow(), "summary": summary}}
+    )
+    # Only the first close of a run feeds the analytics buckets
+    if run:
+        responses = await _col("standup_responses").find({"workspace_id": run["workspace_id"], "run_id": run_id}, RESPONSE_FIELDS).to_list(None)
+        pref = await _col("channel_preferences").find_one({"workspace_id": run["workspace_id"]}, {"timezone": 1})
+        updates = build_analytics_updates(run, responses, (pref or {}).get("timezone"))
+        await _col("standup_analytics").bulk_write(updates, ordered=False)
+
+@timed_db
+async def get_responses_for_run(workspace_id, run_id):
+    return await _col("standup_responses").find({"workspace_id": workspace_id, "run_id": run_id}).to_list(None)
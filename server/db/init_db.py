@@ -4,7 +4,9 @@ Database initialization script for Auto Standup
 Creates collections and indexes for the standup system
 """
 from mongo import db
+from common.retention import ensure_retention_indexes, RESPONSE_RETENTION_DAYS, RAW_EVENT_RETENTION_DAYS, RUN_RETENTION_DAYS
 from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 import os
 from dotenv import load_dotenv
 
@@ -53,8 +55,36 @@ def create_collections_and_indexes():
     responses_col.create_index([("run_id", ASCENDING)])
     responses_col.create_index([("user_id", ASCENDING)])
     responses_col.create_index([("created_at", DESCENDING)])
+    # One response per Slack message; backstop for event retries (see slack/dedup.py)
+    try:
+        responses_col.create_index(
+            [("workspace_id", ASCENDING), ("user_id", ASCENDING), ("ts", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"ts": {"$type": "string"}},
+            name="responses_unique_message"
+        )
+    except OperationFailure as e:
+        print(f"⚠️ Could not create unique response index (duplicate replies already stored?): {e}")
     print("✅ Standup responses collection and indexes created")
     
+    # 5. Standup analytics collection (precomputed daily buckets)
+    print("📈 Creating standup_analytics collection...")
+    analytics_col = db["standup_analytics"]
+    
+    # One bucket per workspace/user/day; workspace-level buckets have user_id null
+    analytics_col.create_index([("workspace_id", ASCENDING), ("user_id", ASCENDING), ("day", ASCENDING)], unique=True)
+    print("✅ Standup analytics collection and indexes created")
+    
+    # 6. Standup run locks (one run per workspace per local day, see db/run_lock.py)
+    print("🔒 Creating standup_run_locks collection...")
+    db["standup_run_locks"].create_index([("expire_at", ASCENDING)], expireAfterSeconds=0)
+    print("✅ Standup run locks collection and indexes created")
+    
+    # 7. Retention: TTL indexes on raw data and the standup_history rollup collection
+    print("🧹 Applying retention settings...")
+    ensure_retention_indexes()
+    print(f"✅ Retention applied (responses: {RESPONSE_RETENTION_DAYS}d, raw events: {RAW_EVENT_RETENTION_DAYS}d, rolled-up runs: {RUN_RETENTION_DAYS}d)")
+    
     print("\n🎉 Database initialization completed successfully!")
     
     # Show collection stats
@@ -115,7 +145,7 @@ def drop_collections():
     confirm = input("Type 'DELETE' to confirm: ")
     
     if confirm == "DELETE":
-        collections = ["workspaces", "users", "standup_runs", "standup_responses"]
+        collections = ["workspaces", "users", "standup_runs", "standup_responses", "raw_events", "standup_history", "standup_analytics", "standup_run_locks"]
         for collection_name in collections:
             db[collection_name].drop()
             print(f"🗑️  Dropped collection: {collection_name}")
@@ -127,7 +157,7 @@ def show_collection_info():
     """Show information about existing collections"""
     print("\n📋 Collection Information:")
     
-    collections = ["workspaces", "users", "standup_runs", "standup_responses"]
+    collections = ["workspaces", "users", "standup_runs", "standup_responses", "raw_events", "standup_history", "standup_analytics", "standup_run_locks"]
     
     for collection_name in collections:
         if collection_name in db.list_collection_names():
@@ -1,14 +1,20 @@
 from .mongo import db
 from datetime import datetime
 from bson.objectid import ObjectId
+from common.metrics import timed_db
+from common.tracing import inject_context
+from .analytics import analytics_col, build_analytics_updates, RESPONSE_FIELDS
 
 workspaces_col = db["workspaces"]
 users_col = db["users"]
 runs_col = db["standup_runs"]
 responses_col = db["standup_responses"]
 channel_preferences_col = db["channel_preferences"]
+raw_events_col = db["raw_events"]
+history_col = db["standup_history"]
 
 # Workspaces
+@timed_db
 def save_workspace(workspace_id, workspace_name, bot_token, installer=None):
     workspaces_col.update_one(
         {"workspace_id": workspace_id},
@@ -21,13 +27,46 @@ def save_workspace(workspace_id, workspace_name, bot_token, installer=None):
         upsert=True
     )
 
+@timed_db
 def get_workspace_by_id(workspace_id):
     return workspaces_col.find_one({"workspace_id": workspace_id})
 
+@timed_db
 def get_all_workspaces():
     return list(workspaces_col.find({}, {"_id": 0, "workspace_id": 1, "workspace_name": 1}))
 
+@timed_db
+def get_workspaces_page(after=None, limit=100):
+    """Workspaces ordered by workspace_id, starting after the given id (keyset pagination)"""
+    query = {"workspace_id": {"$gt": after}} if after else {}
+    return list(workspaces_col.find(query, {"_id": 0, "workspace_id": 1, "workspace_name": 1}).sort("workspace_id", 1).limit(limit))
+
+@timed_db
+def get_workspace_setup(workspace_id):
+    """Workspace name plus its channel preference in one round-trip (never the bot token)"""
+    docs = list(workspaces_col.aggregate([
+        {"$match": {"workspace_id": workspace_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "channel_preferences",
+            "localField": "workspace_id",
+            "foreignField": "workspace_id",
+            "as": "preference"
+        }},
+        {"$project": {
+            "_id": 0,
+            "workspace_id": 1,
+            "workspace_name": 1,
+            "preference.channel_id": 1,
+            "preference.channel_name": 1,
+            "preference.standup_time": 1,
+            "preference.timezone": 1
+        }}
+    ]))
+    return docs[0] if docs else None
+
 # Channel preferences
+@timed_db
 def save_channel_preference(workspace_id, channel_id, channel_name):
     """Save the selected channel for a workspace"""
     channel_preferences_col.update_one(
@@ -40,10 +79,12 @@ def save_channel_preference(workspace_id, channel_id, channel_name):
         upsert=True
     )
 
+@timed_db
 def get_channel_preference(workspace_id):
     """Get the selected channel for a workspace"""
     return channel_preferences_col.find_one({"workspace_id": workspace_id})
 
+@timed_db
 def update_channel_preference(workspace_id, channel_id, channel_name, standup_time=None, timezone=None):
     """Update the selected channel and schedule for a workspace"""
     update_data = {
@@ -64,6 +105,7 @@ def update_channel_preference(workspace_id, channel_id, channel_name, standup_ti
     )
 
 # Users
+@timed_db
 def save_user(workspace_id, user_id, real_name=None, dm_channel_id=None):
     users_col.update_one(
         {"workspace_id": workspace_id, "user_id": user_id},
@@ -75,12 +117,15 @@ def save_user(workspace_id, user_id, real_name=None, dm_channel_id=None):
         upsert=True
     )
 
+@timed_db
 def get_users(workspace_id):
     return list(users_col.find({"workspace_id": workspace_id}))
 
+@timed_db
 def get_user(workspace_id, user_id):
     return users_col.find_one({"workspace_id": workspace_id, "user_id": user_id})
 
+@timed_db
 def update_user_dm(workspace_id, user_id, dm_channel_id):
     users_col.update_one(
         {"workspace_id": workspace_id, "user_id": user_id},
@@ -88,31 +133,69 @@ def update_user_dm(workspace_id, user_id, dm_channel_id):
     )
 
 # Standup runs & responses
-def create_standup_run(workspace_id, created_by="system"):
+@timed_db
+def create_standup_run(workspace_id, created_by="system", invited_count=0):
     res = runs_col.insert_one({
         "workspace_id": workspace_id,
         "created_by": created_by,
         "created_at": datetime.utcnow(),
-        "status": "open"
+        "status": "open",
+        "invited_count": invited_count,
+        "trace_context": inject_context()
     })
     return str(res.inserted_id)
 
-def close_standup_run(run_id):
-    runs_col.update_one({"_id": ObjectId(run_id)}, {"$set": {"status": "closed", "closed_at": datetime.utcnow()}})
+@timed_db
+def get_standup_run(run_id):
+    return runs_col.find_one({"_id": ObjectId(run_id)}, {"status": 1, "workspace_id": 1, "invited_count": 1})
+
+@timed_db
+def close_standup_run(run_id, summary=None):
+    run = runs_col.find_one_and_update(
+        {"_id": ObjectId(run_id), "status": {"$ne": "closed"}},
+        {"$set": {"status": "closed", "closed_at": datetime.utcnow(), "summary": summary}}
+    )
+    # Only the first close of a run feeds the analytics buckets
+    if run:
+        responses = list(responses_col.find({"workspace_id": run["workspace_id"], "run_id": run_id}, RESPONSE_FIELDS))
+        pref = channel_preferences_col.find_one({"workspace_id": run["workspace_id"]}, {"timezone": 1})
+        analytics_col.bulk_write(build_analytics_updates(run, responses, (pref or {}).get("timezone")), ordered=False)
 
+@timed_db
 def save_response(workspace_id, run_id, user_id, text, raw_event=None, ts=None):
+    now = datetime.utcnow()
     responses_col.insert_one({
         "workspace_id": workspace_id,
         "run_id": run_id,
         "user_id": user_id,
         "text": text,
-        "raw_event": raw_event,
         "ts": ts,
-        "created_at": datetime.utcnow()
+        "created_at": now
     })
-
+    # Raw Slack payloads live in their own collection so they can expire sooner than responses
+    if raw_event is not None:
+        raw_events_col.insert_one({
+            "workspace_id": workspace_id,
+            "run_id": run_id,
+            "user_id": user_id,
+            "ts": ts,
+            "event": raw_event,
+            "created_at": now
+        })
+
+@timed_db
 def get_responses_for_run(workspace_id, run_id):
     return list(responses_col.find({"workspace_id": workspace_id, "run_id": run_id}))
 
+@timed_db
 def clear_responses_for_workspace(workspace_id):
     responses_col.delete_many({"workspace_id": workspace_id})
+
+# Standup history (compacted closed runs, see common/retention.py)
+@timed_db
+def get_standup_history(workspace_id, limit=30, before=None):
+    """Newest first; pass the last item's created_at as before to get the next page"""
+    query = {"workspace_id": workspace_id}
+    if before is not None:
+        query["created_at"] = {"$lt": before}
+    return list(history_col.find(query, {"_id": 0}).sort("created_at", -1).limit(limit))
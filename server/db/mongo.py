@@ -1,11 +1,2 @@
-from pymongo import MongoClient
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-DB_NAME = os.getenv("DB_NAME", "standup")
-
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# Connections come from the shared factory in common/mongo.py
+from common.mongo import MONGO_URI, DB_NAME, db, get_client, get_db, get_async_db, get_pool_metrics
@@ -0,0 +1,67 @@
+# One standup run per workspace per local day.
+# The lock is a standup_run_locks document keyed "<workspace_id>:<YYYY-MM-DD>"; the
+# unique _id makes the first start win across beat instances, retries and replicas.
+import os
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from .mongo import get_async_db
+from .async_models import delete_standup_run
+from .analytics import local_day
+from common.metrics import timed_db
+
+# How long a holder has to create its run; after that another start may take over
+RUN_LOCK_LEASE_SECONDS = int(os.getenv("RUN_LOCK_LEASE_SECONDS", "600"))
+RUN_LOCK_TTL_DAYS = 2  # expire_at for the TTL index; a day's lock only matters that day
+
+def _col():
+    return get_async_db()["standup_run_locks"]
+
+def run_lock_key(workspace_id, tz_name=None, now=None):
+    """Lock key for the workspace's standup day in its own timezone (the analytics bucket's day)"""
+    return f"{workspace_id}:{local_day(now or datetime.utcnow(), tz_name)}"
+
+@timed_db
+async def acquire_run_lock(key, owner, lease_seconds=RUN_LOCK_LEASE_SECONDS):
+    """
+    Take the day's run lock for owner (a graph thread id or similar).
+    Returns (acquired, lock). When not acquired, lock is the current holder's
+    document: its owner and, once the run exists, its run_id.
+    """
+    now = datetime.utcnow()
+    lease = {"owner": owner, "run_id": None, "acquired_at": now, "lease_until": now + timedelta(seconds=lease_seconds)}
+    try:
+        doc = {"_id": key, **lease, "expire_at": now + timedelta(days=RUN_LOCK_TTL_DAYS)}
+        await _col().insert_one(doc)
+        return True, doc
+    except DuplicateKeyError:
+        pass
+    # A holder that never got as far as creating its run loses the lock when its lease runs out
+    taken = await _col().find_one_and_update(
+        {"_id": key, "run_id": None, "lease_until": {"$lt": now}},
+        {"$set": lease},
+        return_document=ReturnDocument.AFTER
+    )
+    if taken:
+        return True, taken
+    return False, await _col().find_one({"_id": key})
+
+@timed_db
+async def bind_run_lock(key, owner, run_id):
+    """Record the holder's run; from here on the lock holds for the rest of the day"""
+    res = await _col().update_one({"_id": key, "owner": owner}, {"$set": {"run_id": run_id, "lease_until": None}})
+    return res.modified_count == 1
+
+@timed_db
+async def release_run_lock(key, owner, run_id=None):
+    """Give the lock back after a failed start.
+
+    Without run_id only a lock that has no run yet is released; pass the bound
+    run_id when that run is known to have sent no DMs.
+    """
+    await _col().delete_one({"_id": key, "owner": owner, "run_id": run_id})
+
+async def abandon_run(key, owner, run_id):
+    """Undo a start whose run sent no DMs: delete the run and free the day for a retry"""
+    await delete_standup_run(run_id)
+    await release_run_lock(key, owner, run_id)
@@ -1,43 +1,70 @@
 # LangGraph workflow definition
-from typing import TypedDict, Sequence
+from typing import TypedDict, Literal, Optional
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import interrupt, Command
 import asyncio
 import time
-from db.models import get_channel_preference
+from db.async_models import get_channel_preference
+from db.run_lock import run_lock_key, acquire_run_lock, release_run_lock
+from common.metrics import timed, GRAPH_NODE_SECONDS, RESUMES_TOTAL, RUN_STARTS_TOTAL
+from common.tracing import span, traced
 # Import our agents
 from agents.standup_agent import collect_standups
 from agents.summarizer_agent import summarize_standups
+from summary_queue import SUMMARY_QUEUE, enqueue_summary
 
 # Global app instance for reuse
 _standup_app = None
 
-# State definition
+StandupStep = Literal["collecting", "waiting_for_responses", "summary_queued", "completed", "error"]
+
+# State definition. Checkpointed after every node and returned by /resume, so
+# it holds ids, counts and status only; the summary text stays on the run document.
 class StandupState(TypedDict):
     workspace_id: str
     run_id: str
-    messages: Sequence[str]
-    current_step: str
-    completed: bool
     channel_id: str  # Channel to post summary to
+    current_step: StandupStep
+    completed: bool
+    invited_count: int
+    dm_failures: int
+    response_count: int
+    summary_ref: Optional[str]  # standup_runs _id whose "summary" field holds the text
+    error: Optional[str]
+    run_lock: Optional[str]  # standup_run_locks _id this thread holds for the day
+
+def initial_state(workspace_id: str, channel_id: str = None, run_lock: str = None) -> StandupState:
+    return StandupState(
+        workspace_id=workspace_id,
+        run_id="",
+        channel_id=channel_id or "",
+        current_step="collecting",
+        completed=False,
+        invited_count=0,
+        dm_failures=0,
+        response_count=0,
+        summary_ref=None,
+        error=None,
+        run_lock=run_lock
+    )
 
 # Node functions
-async def collect_standups_node(state: StandupState) -> StandupState:
+@traced("graph.collect_standups_node")
+@timed(GRAPH_NODE_SECONDS, node="collect_standups_node")
+async def collect_standups_node(state: StandupState, config) -> StandupState:
     
-    # Call the standup collection function
-    run_id = await collect_standups(state['workspace_id'])
+    # Call the standup collection function; the thread id is the run lock's owner
+    collected = await collect_standups(state['workspace_id'], run_lock=state.get('run_lock'), owner=config["configurable"]["thread_id"])
     
     # Update state
-    updated_state = {
+    return {
         **state,
-        "run_id": run_id,
-        "current_step": "waiting_for_responses",
-        "messages": [*state["messages"], f"Standup collection initiated. Run ID: {run_id}. Workflow paused for 5 minutes..."]
+        "run_id": collected["run_id"],
+        "invited_count": collected["invited_count"],
+        "dm_failures": collected["dm_failures"],
+        "current_step": "waiting_for_responses"
     }
-    
-    
-    return updated_state
 
 async def summarize_standups_node(state: StandupState) -> StandupState:
     value=interrupt({
@@ -47,24 +74,41 @@ async def summarize_standups_node(state: StandupState) -> StandupState:
         "workspace_id": state["workspace_id"]
     })
     
+    if SUMMARY_QUEUE:
+        try:
+            # The summary worker pool does the LLM call; the run document gets the text.
+            # Redis and the broker publish are blocking, so keep them off the shared loop.
+            await asyncio.to_thread(enqueue_summary, state["workspace_id"], state["run_id"], state.get("channel_id"), state.get("invited_count", 0))
+            return {
+                **state,
+                "current_step": "summary_queued",
+                "completed": True,
+                "summary_ref": state["run_id"]
+            }
+        except Exception as e:
+            print(f"Could not queue summary, summarizing inline: {e}")
+    
     try:
-        # Pass the channel_id to the summarizer
-        summary = await summarize_standups(state['workspace_id'], state['run_id'], state.get('channel_id'))
+        # Pass the channel_id to the summarizer; timed after the interrupt so only real work is measured
+        with GRAPH_NODE_SECONDS.labels(node="summarize_standups_node").time(), \
+                span("graph.summarize_standups_node", workspace_id=state["workspace_id"], run_id=state["run_id"]):
+            summarized = await summarize_standups(state['workspace_id'], state['run_id'], state.get('channel_id'))
         
+        # The summary text was saved on the run by close_standup_run; keep only a reference
         return {
             **state,
             "current_step": "completed",
             "completed": True,
-            "messages": [*state["messages"], f"Standup summary completed and posted to channel:\n{summary}"]
+            "response_count": summarized["response_count"],
+            "summary_ref": state["run_id"]
         }
     except Exception as e:
-        error_msg = f"Error summarizing standups: {str(e)}"
-        print(error_msg)
+        print(f"Error summarizing standups: {str(e)}")
         return {
             **state,
             "current_step": "error",
             "completed": True,
-            "messages": [*state["messages"], error_msg]
+            "error": str(e)[:500]
         }
 
 def create_standup_graph():
@@ -95,24 +139,15 @@ def get_standup_app():
 def start_standup_workflow(workspace_id: str, channel_id: str = None, thread_id: str = None):
     """Start a new standup workflow for a workspace"""
     
-    initial_state = StandupState(
-        workspace_id=workspace_id,
-        run_id="",
-        messages=[],
-        current_step="collecting",
-        completed=False,
-        channel_id=channel_id or ""
-    )
-    
     app = create_standup_graph()
     
     if thread_id:
         config = {"configurable": {"thread_id": thread_id}}
-        result = app.invoke(initial_state, config)
+        result = app.invoke(initial_state(workspace_id, channel_id), config)
     else:
         new_thread_id = f"standup_{workspace_id}_{int(time.time())}"
         config = {"configurable": {"thread_id": new_thread_id}}
-        result = app.invoke(initial_state, config)
+        result = app.invoke(initial_state(workspace_id, channel_id), config)
         result["thread_id"] = new_thread_id
     
     return result
@@ -129,32 +164,24 @@ def resume_standup_workflow(thread_id: str, app: StateGraph):
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
-async def start_standup_workflow_async(workspace_id: str, channel_id: str = None, thread_id: str = None, app: StateGraph = None):
+async def start_standup_workflow_async(workspace_id: str, channel_id: str = None, thread_id: str = None, app: StateGraph = None, run_lock: str = None):
     """Async version of the standup workflow"""
-    initial_state = StandupState(
-        workspace_id=workspace_id,
-        run_id="",
-        messages=[],
-        current_step="collecting",
-        completed=False,
-        channel_id=channel_id or ""
-    )
-    
+    state = initial_state(workspace_id, channel_id, run_lock)
     app = app or get_standup_app()
 
     
     result = {}
     if thread_id:
         config = {"configurable": {"thread_id": thread_id}}
-        result = await app.ainvoke(initial_state, config=config)
+        result = await app.ainvoke(state, config=config)
         result["thread_id"] = thread_id
     else:
         print("Starting new thread")
         new_thread_id = f"standup_{workspace_id}_{int(time.time())}"
         config = {"configurable": {"thread_id": new_thread_id}}
-        result = await app.ainvoke(initial_state, config=config)
+        result = await app.ainvoke(state, config=config)
         result["thread_id"] = new_thread_id
-    print(f"Result: {result}")
+    print(f"Result: run {result.get('run_id')} {result.get('current_step')}, {result.get('invited_count')} invited")
     return result
 
 
@@ -216,18 +243,39 @@ async def start_standup_endpoint(workspace_id: str, channel_id: str = None):
     try:
         print(f"🚀 Starting standup for workspace: {workspace_id}")
         
+        channel_pref = await get_channel_preference(workspace_id)
         if not channel_id:
-            channel_pref = get_channel_preference(workspace_id)
             if channel_pref:
                 channel_id = channel_pref["channel_id"]
                 print(f"Using stored channel: {channel_pref['channel_name']} ({channel_id})")
             else:
                 print("Warning: No channel selected for this workspace")
         
-        result = await start_standup_workflow_async(workspace_id, channel_id=channel_id, app=get_standup_app())
+        # One run per workspace per day: a duplicate beat fire or a retried /start attaches to it
+        thread_id = f"standup_{workspace_id}_{int(time.time())}"
+        run_lock = run_lock_key(workspace_id, (channel_pref or {}).get("timezone"))
+        acquired, lock = await acquire_run_lock(run_lock, thread_id)
+        if not acquired:
+            print(f"🔒 Standup already started today ({run_lock}); attaching to thread {lock['owner']}")
+            RUN_STARTS_TOTAL.labels(outcome="attached").inc()
+            return {
+                "success": True,
+                "attached": True,
+                "thread_id": lock["owner"],
+                "run_id": lock.get("run_id"),
+                "workspace_id": workspace_id,
+                "channel_id": channel_id
+            }
+        
+        try:
+            result = await start_standup_workflow_async(workspace_id, channel_id=channel_id, thread_id=thread_id, app=get_standup_app(), run_lock=run_lock)
+        except Exception:
+            await release_run_lock(run_lock, thread_id)
+            raise
         
         if "thread_id" in result:
             print(f"✅ Standup started successfully. Thread ID: {result['thread_id']}")
+            RUN_STARTS_TOTAL.labels(outcome="started").inc()
             return {
                 "success": True,
                 "thread_id": result["thread_id"],
@@ -236,6 +284,7 @@ async def start_standup_endpoint(workspace_id: str, channel_id: str = None):
             }
         else:
             print("❌ Failed to start standup workflow")
+            await release_run_lock(run_lock, thread_id)
             return {
                 "success": False,
                 "error": "Failed to start workflow"
@@ -257,12 +306,14 @@ async def resume_standup_endpoint(thread_id: str):
         
         if "status" in result and result["status"] == "error":
             print(f"❌ Error resuming workflow: {result['error']}")
+            RESUMES_TOTAL.labels(outcome="error").inc()
             return {
                 "success": False,
                 "error": result["error"]
             }
         else:
             print(f"✅ Workflow resumed successfully")
+            RESUMES_TOTAL.labels(outcome="success").inc()
             return {
                 "success": True,
                 "thread_id": thread_id,
@@ -271,6 +322,7 @@ async def resume_standup_endpoint(thread_id: str):
             
     except Exception as e:
         print(f"❌ Error resuming standup: {e}")
+        RESUMES_TOTAL.labels(outcome="error").inc()
         return {
             "success": False,
             "error": str(e)
@@ -0,0 +1,96 @@
+# Cached, paginated channel listing for the setup UI
+import os
+import time
+import threading
+from bisect import bisect_left
+from slack.clients import InstrumentedWebClient
+
+CHANNEL_CACHE_TTL_SECONDS = int(os.getenv("CHANNEL_CACHE_TTL_SECONDS", "300"))
+SLACK_PAGE_SIZE = 1000  # max page size Slack allows for conversations.list
+
+# Slack events after which a workspace's channel list is out of date (group_* = private channels)
+CHANNEL_CHANGE_EVENTS = {
+    "channel_created", "channel_rename", "channel_archive", "channel_unarchive", "channel_deleted",
+    "group_rename", "group_archive", "group_unarchive", "group_deleted",
+}
+
+# workspace_id -> {"channels": [...sorted by name], "names": [...lowercase names], "fetched_at": float}
+_cache = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+def _workspace_lock(workspace_id):
+    with _locks_guard:
+        return _locks.setdefault(workspace_id, threading.Lock())
+
+def fetch_all_channels(bot_token):
+    """Walk every conversations.list page, skipping archived channels"""
+    client = InstrumentedWebClient(token=bot_token)
+    channels = []
+    cursor = None
+    while True:
+        response = client.conversations_list(
+            types="public_channel,private_channel",
+            exclude_archived=True,
+            limit=SLACK_PAGE_SIZE,
+            cursor=cursor
+        )
+        for channel in response.get("channels", []):
+            if channel.get("is_archived", False):
+                continue
+            channels.append({
+                "id": channel["id"],
+                "name": channel["name"],
+                "is_private": channel.get("is_private", False)
+            })
+        cursor = response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+    channels.sort(key=lambda c: c["name"].lower())
+    return channels
+
+def get_cached_channels(workspace_id, bot_token):
+    """Return the cache entry for a workspace, refetching when stale or invalidated.
+
+    A per-workspace lock means concurrent page loads trigger a single Slack walk.
+    """
+    entry = _cache.get(workspace_id)
+    if entry and time.time() - entry["fetched_at"] < CHANNEL_CACHE_TTL_SECONDS:
+        return entry
+    with _workspace_lock(workspace_id):
+        entry = _cache.get(workspace_id)
+        if not entry or time.time() - entry["fetched_at"] >= CHANNEL_CACHE_TTL_SECONDS:
+            channels = fetch_all_channels(bot_token)
+            entry = {
+                "channels": channels,
+                "names": [c["name"].lower() for c in channels],
+                "fetched_at": time.time()
+            }
+            _cache[workspace_id] = entry
+        return entry
+
+def invalidate_channels(workspace_id):
+    """Drop this process's cached list; the next page load walks Slack again.
+
+    Other server processes keep theirs until it expires (CHANNEL_CACHE_TTL_SECONDS).
+    """
+    _cache.pop(workspace_id, None)
+
+def page_channels(entry, prefix="", cursor=None, limit=100):
+    """Slice one page of channels whose name starts with prefix.
+
+    Names are kept sorted, so a prefix match is a contiguous range found by
+    binary search. The cursor is the offset of the next page.
+    """
+    names = entry["names"]
+    prefix = prefix.lower().lstrip("#")
+    start = bisect_left(names, prefix)
+    end = bisect_left(names, prefix + "\uffff") if prefix else len(names)
+    offset = start + (int(cursor) if cursor else 0)
+    page_end = min(offset + limit, end)
+    return {
+        "channels": entry["channels"][offset:page_end],
+        "next_cursor": str(page_end - start) if page_end < end else None,
+        "total": end - start,
+        "cached_at": entry["fetched_at"]
+    }
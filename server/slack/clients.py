@@ -0,0 +1,45 @@
+# Slack SDK clients that record per-method latency
+import os
+import time
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.web.client import WebClient
+from opentelemetry.trace import SpanKind
+from common.metrics import SLACK_API_SECONDS
+from common.tracing import span
+
+# Overridable so benchmarks and local runs can point at a stand-in Slack API
+SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api/")
+
+# Every SDK method (chat_postMessage, conversations_open, ...) goes through api_call,
+# so overriding it covers all of them with the Slack method name as the label.
+
+class InstrumentedAsyncWebClient(AsyncWebClient):
+    def __init__(self, token=None, base_url=SLACK_API_BASE_URL, **kwargs):
+        super().__init__(token=token, base_url=base_url, **kwargs)
+
+    async def api_call(self, api_method, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with span(f"slack.{api_method}", kind=SpanKind.CLIENT):
+                response = await super().api_call(api_method, **kwargs)
+            status = "ok"
+            return response
+        finally:
+            SLACK_API_SECONDS.labels(method=api_method, status=status).observe(time.perf_counter() - start)
+
+
+class InstrumentedWebClient(WebClient):
+    def __init__(self, token=None, base_url=SLACK_API_BASE_URL, **kwargs):
+        super().__init__(token=token, base_url=base_url, **kwargs)
+
+    def api_call(self, api_method, **kwargs):
+        start = time.perf_counter()
+        status = "error"
+        try:
+            with span(f"slack.{api_method}", kind=SpanKind.CLIENT):
+                response = super().api_call(api_method, **kwargs)
+            status = "ok"
+            return response
+        finally:
+            SLACK_API_SECONDS.labels(method=api_method, status=status).observe(time.perf_counter() - start)
@@ -0,0 +1,66 @@
+# Drop Slack event redeliveries (X-Slack-Retry-Num) before they reach Mongo.
+# Tiers: in-process LRU -> Redis SET NX shared by all replicas -> unique index on responses.
+import os
+import time
+import threading
+from collections import OrderedDict
+from common.redis_client import get_redis
+
+EVENT_DEDUP_TTL_SECONDS = int(os.getenv("EVENT_DEDUP_TTL_SECONDS", "3600"))
+EVENT_DEDUP_LOCAL_SIZE = int(os.getenv("EVENT_DEDUP_LOCAL_SIZE", "10000"))
+REDIS_KEY_PREFIX = "standup:event:"
+
+_seen = OrderedDict()  # key -> expiry (monotonic)
+_seen_lock = threading.Lock()
+
+def event_key(payload):
+    """Identity of a delivery: the message's (channel, ts), else Slack's event_id"""
+    event = payload.get("event", {})
+    if event.get("channel") and event.get("ts"):
+        return f"{payload.get('team_id')}:{event['channel']}:{event['ts']}"
+    return payload.get("event_id")
+
+def _seen_locally(key, now):
+    with _seen_lock:
+        expiry = _seen.get(key)
+        if expiry is not None and expiry > now:
+            _seen.move_to_end(key)
+            return True
+        _seen[key] = now + EVENT_DEDUP_TTL_SECONDS
+        _seen.move_to_end(key)
+        while len(_seen) > EVENT_DEDUP_LOCAL_SIZE:
+            _seen.popitem(last=False)
+        return False
+
+def claim_event(key):
+    """Return True if this is the first delivery of the event, False for a retry.
+
+    Redis errors fall back to the local set; the responses unique index still
+    catches a retry that lands on another replica.
+    """
+    if not key:
+        return True
+    if _seen_locally(key, time.monotonic()):
+        return False
+    r = get_redis()
+    if r is None:
+        return True
+    try:
+        return bool(r.set(REDIS_KEY_PREFIX + key, 1, nx=True, ex=EVENT_DEDUP_TTL_SECONDS))
+    except Exception as e:
+        print(f"⚠️ Event dedup skipped Redis: {e}")
+        return True
+
+def release_event(key):
+    """Forget a claim whose processing failed so Slack's retry is handled"""
+    if not key:
+        return
+    with _seen_lock:
+        _seen.pop(key, None)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.delete(REDIS_KEY_PREFIX + key)
+    except Exception as e:
+        print(f"⚠️ Could not release event claim {key}: {e}")
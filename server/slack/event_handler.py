@@ -1,10 +1,15 @@
 # Slack event processing
 import os, hmac, hashlib, time
 from flask import make_response
+from pymongo.errors import DuplicateKeyError
 from db.models import save_response
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 from db.models import runs_col
+from common.metrics import timed_db, RESPONSES_INGESTED_TOTAL
+from common.tracing import span
+from slack.dedup import event_key, claim_event, release_event
+from slack.channels import CHANNEL_CHANGE_EVENTS, invalidate_channels
 
 load_dotenv()
 SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
@@ -25,16 +30,19 @@ def verify_slack_request(req):
     slack_sig = req.headers.get("X-Slack-Signature")
     return hmac.compare_digest(my_sig, slack_sig)
 
-def get_open_standup_run(workspace_id):
+@timed_db
+def find_open_standup_run(workspace_id):
     today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
 
-    run = runs_col.find_one({
+    return runs_col.find_one({
         "workspace_id": workspace_id,
         "status": "open",
         "created_at": {"$gte": today_start, "$lt": today_end}
-    })
+    }, {"_id": 1, "trace_context": 1}, sort=[("created_at", -1)])
 
+def get_open_standup_run(workspace_id):
+    run = find_open_standup_run(workspace_id)
     if run:
         return str(run["_id"])
     else:
@@ -43,15 +51,35 @@ def get_open_standup_run(workspace_id):
 def handle_event(payload):
     if payload.get("type") == "event_callback":
         event = payload.get("event", {})
-        if event.get("type") == "message" and event.get("channel_type") == "im" and not event.get("bot_id"):
+        if event.get("type") in CHANNEL_CHANGE_EVENTS:
+            # Channel created/renamed/archived: the setup page's cached list is stale
+            invalidate_channels(payload.get("team_id"))
+        elif event.get("type") == "message" and event.get("channel_type") == "im" and not event.get("bot_id"):
             workspace_id = payload.get("team_id")
             user_id = event.get("user")
             text = event.get("text")
             ts = event.get("ts")
 
-            run_id = get_open_standup_run(workspace_id)
-            if run_id:
-                save_response(workspace_id, run_id, user_id, text, raw_event=event, ts=ts)
-            else:
-                pass
+            # Slack retries slow acks; a redelivery costs only this check
+            key = event_key(payload)
+            if not claim_event(key):
+                RESPONSES_INGESTED_TOTAL.labels(outcome="duplicate").inc()
+                return make_response("", 200)
+
+            try:
+                run = find_open_standup_run(workspace_id)
+                if run:
+                    run_id = str(run["_id"])
+                    # Parented on the run's stored trace so replies show up in the run's trace
+                    with span("slack.event.reply", carrier=run.get("trace_context") or {}, workspace_id=workspace_id, run_id=run_id):
+                        save_response(workspace_id, run_id, user_id, text, raw_event=event, ts=ts)
+                    RESPONSES_INGESTED_TOTAL.labels(outcome="saved").inc()
+                else:
+                    RESPONSES_INGESTED_TOTAL.labels(outcome="no_open_run").inc()
+            except DuplicateKeyError:
+                # Backstop: the responses unique index caught a retry the caches missed
+                RESPONSES_INGESTED_TOTAL.labels(outcome="duplicate").inc()
+            except Exception:
+                release_event(key)
+                raise
     return make_response("", 200)
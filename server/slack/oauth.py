@@ -1,9 +1,10 @@
 # Slack OAuth flow for multi-workspace
-import os, requests, asyncio
+import os, requests
 from flask import jsonify, redirect
 from dotenv import load_dotenv
 from db.models import save_workspace
 from slack.slack_client import make_client_and_sync_users
+from async_runner import run_async
 
 load_dotenv()
 
@@ -47,11 +48,7 @@ def oauth_callback(code):
 
     save_workspace(workspace_id, workspace_name, bot_token, installer=resp.get("authed_user", {}).get("id"))
 
-    try:
-        asyncio.run(make_client_and_sync_users(workspace_id, bot_token))
-    except RuntimeError:
-        loop = asyncio.get_event_loop()
-        loop.create_task(make_client_and_sync_users(workspace_id, bot_token))
+    run_async(make_client_and_sync_users(workspace_id, bot_token))
 
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
     setup_url = f"{frontend_url}/setup?workspace_id={workspace_id}"
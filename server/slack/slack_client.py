@@ -1,21 +1,32 @@
 # Slack API wrappers
-from slack_sdk.web.async_client import AsyncWebClient
-from db.models import save_user, update_user_dm, get_users, get_workspace_by_id, get_user, get_channel_preference, create_standup_run
+import os
+import time
+import asyncio
+import uuid
+from slack_sdk.errors import SlackApiError
+from slack.clients import InstrumentedAsyncWebClient
+from db.async_models import save_user, update_user_dm, get_users, get_workspace_by_id, get_user, get_channel_preference, create_standup_run, remove_users, delete_standup_run
+from db.run_lock import run_lock_key, acquire_run_lock, bind_run_lock, abandon_run
+from common.metrics import DMS_TOTAL, DM_PREWARM_TOTAL
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# conversations.open is Tier 3 (50+/min per workspace); stay under it so kickoff keeps headroom
+DM_PREWARM_OPENS_PER_MINUTE = float(os.getenv("DM_PREWARM_OPENS_PER_MINUTE", "40"))
+DM_PREWARM_MAX_SECONDS = float(os.getenv("DM_PREWARM_MAX_SECONDS", "300"))
+
 # Helper: create client from workspace token saved in DB
 async def get_client_for_workspace(workspace_id):
-	ws = get_workspace_by_id(workspace_id)
+	ws = await get_workspace_by_id(workspace_id)
 	if not ws:
 		raise Exception("Workspace not found")
 	token = ws.get("bot_token")
-	return AsyncWebClient(token=token)
+	return InstrumentedAsyncWebClient(token=token)
 
 # On install: sync users and store dm ids
 async def make_client_and_sync_users(workspace_id, bot_token):
-	client = AsyncWebClient(token=bot_token)
+	client = InstrumentedAsyncWebClient(token=bot_token)
 	cursor = None
 	while True:
 		resp = await client.users_list(cursor=cursor)
@@ -28,34 +39,118 @@ async def make_client_and_sync_users(workspace_id, bot_token):
 			# open dm (returns existing DM if already opened)
 			dm = await client.conversations_open(users=[uid])
 			dm_id = dm["channel"]["id"]
-			save_user(workspace_id, uid, real_name, dm_id)
+			await save_user(workspace_id, uid, real_name, dm_id)
 		cursor = resp.get("response_metadata", {}).get("next_cursor")
 		if not cursor:
 			break
 
-# Send DM using cached dm_channel_id; open & update if missing
-async def send_dm_with_cache(workspace_id, user_id, text):
+# Send DM using cached dm_channel_id; open & update if missing.
+# Callers fanning out to a whole team pass the client and the user doc they already
+# loaded, so a pre-warmed user costs exactly one chat_postMessage.
+async def send_dm_with_cache(workspace_id, user_id, text, client=None, user=None):
 	# Skip Slackbot explicitly
 	if user_id == "USLACKBOT":
 		return
-	client = await get_client_for_workspace(workspace_id)
-	u = get_user(workspace_id, user_id)
+	if client is None:
+		client = await get_client_for_workspace(workspace_id)
+	u = user if user is not None else await get_user(workspace_id, user_id)
 	dm = u.get("dm_channel_id") if u else None
 	try:
 		if not dm:
 			res = await client.conversations_open(users=[user_id])
 			dm = res["channel"]["id"]
 			if u:
-				update_user_dm(workspace_id, user_id, dm)
+				await update_user_dm(workspace_id, user_id, dm)
 			else:
-				save_user(workspace_id, user_id, None, dm)
+				await save_user(workspace_id, user_id, None, dm)
 		await client.chat_postMessage(channel=dm, text=text)
 	except Exception as e:
 		# try to re-open and retry once
-		res = await client.conversations_open(users=[user_id])
-		dm = res["channel"]["id"]
-		update_user_dm(workspace_id, user_id, dm)
-		await client.chat_postMessage(channel=dm, text=text)
+		try:
+			res = await client.conversations_open(users=[user_id])
+			dm = res["channel"]["id"]
+			await update_user_dm(workspace_id, user_id, dm)
+			await client.chat_postMessage(channel=dm, text=text)
+		except Exception:
+			DMS_TOTAL.labels(outcome="failed").inc()
+			raise
+	DMS_TOTAL.labels(outcome="sent").inc()
+
+async def _call_with_retry_after(call, deadline, **kwargs):
+	"""Call a Slack method, sleeping out 429s (Retry-After) until the deadline"""
+	while True:
+		try:
+			return await call(**kwargs)
+		except SlackApiError as e:
+			if e.response.status_code != 429:
+				raise
+			wait = float(e.response.headers.get("Retry-After", 1))
+			if time.monotonic() + wait > deadline:
+				raise
+			print(f"⏳ Slack rate limited, retrying in {wait:.0f}s")
+			await asyncio.sleep(wait)
+
+def _is_member(m):
+	uid = m.get("id")
+	return uid and uid != "USLACKBOT" and not m.get("is_bot") and not m.get("deleted")
+
+# Ahead of kickoff: refresh the user list and open missing DMs at a paced rate
+async def prewarm_workspace_dms(workspace_id, max_seconds=DM_PREWARM_MAX_SECONDS):
+	"""
+	Sync users with Slack and open a DM for everyone who lacks one, so the
+	standup fan-out is a single chat_postMessage per user. Users still missing
+	a DM when max_seconds runs out are opened at kickoff as before and picked
+	up by the next warm-up.
+	Returns {"users", "added", "removed", "opened", "failed", "deferred"}.
+	"""
+	deadline = time.monotonic() + max_seconds
+	client = await get_client_for_workspace(workspace_id)
+	known = {u["user_id"]: u for u in await get_users(workspace_id)}
+
+	members = {}
+	cursor = None
+	while True:
+		resp = await _call_with_retry_after(client.users_list, deadline, cursor=cursor, limit=200)
+		for m in resp.get("members", []):
+			if _is_member(m):
+				members[m["id"]] = m.get("profile", {}).get("real_name") or m.get("name")
+		cursor = resp.get("response_metadata", {}).get("next_cursor")
+		if not cursor:
+			break
+
+	added = 0
+	for uid, real_name in members.items():
+		u = known.get(uid)
+		if u is None:
+			added += 1
+		elif u.get("real_name") == real_name:
+			continue
+		await save_user(workspace_id, uid, real_name, u.get("dm_channel_id") if u else None)
+	# An empty list means Slack gave us nothing usable, not that everyone left
+	removed = [uid for uid in known if uid not in members] if members else []
+	await remove_users(workspace_id, removed)
+
+	missing = [uid for uid in members if not (known.get(uid) or {}).get("dm_channel_id")]
+	interval = 60 / DM_PREWARM_OPENS_PER_MINUTE if DM_PREWARM_OPENS_PER_MINUTE > 0 else 0
+	opened = failed = 0
+	for i, uid in enumerate(missing):
+		if time.monotonic() >= deadline:
+			break
+		try:
+			res = await _call_with_retry_after(client.conversations_open, deadline, users=[uid])
+			await update_user_dm(workspace_id, uid, res["channel"]["id"])
+			opened += 1
+		except Exception as e:
+			failed += 1
+			print("prewarm dm error", uid, e)
+		if interval and i + 1 < len(missing):
+			await asyncio.sleep(interval)
+	deferred = len(missing) - opened - failed
+
+	DM_PREWARM_TOTAL.labels(outcome="opened").inc(opened)
+	DM_PREWARM_TOTAL.labels(outcome="failed").inc(failed)
+	DM_PREWARM_TOTAL.labels(outcome="deferred").inc(deferred)
+	return {"users": len(members), "added": added, "removed": len(removed), "opened": opened, "failed": failed, "deferred": deferred}
 
 # Post a message to a channel (channel id or name)
 async def post_message_to_channel(workspace_id, channel, text):
@@ -63,27 +158,42 @@ async def post_message_to_channel(workspace_id, channel, text):
 	client = await get_client_for_workspace(workspace_id)
 	await client.chat_postMessage(channel=channel, text=text)
 
-# Start a standup: create run, DM all users
+# Start a standup: create run, DM all users (or return today's run if one already started)
 async def start_standup_for_workspace(workspace_id, created_by="system", channel_id=None):
-	run_id = create_standup_run(workspace_id, created_by=created_by)
+	# Fails on a missing workspace or token before any run or lock exists
+	client = await get_client_for_workspace(workspace_id)
+	channel_pref = await get_channel_preference(workspace_id)
+	run_lock = run_lock_key(workspace_id, (channel_pref or {}).get("timezone"))
+	owner = f"{created_by}-{uuid.uuid4().hex[:12]}"
+	acquired, lock = await acquire_run_lock(run_lock, owner)
+	if not acquired:
+		print(f"Standup already started today ({run_lock}), run {lock.get('run_id')}")
+		return lock.get("run_id")
+
+	# Skip Slackbot explicitly
+	users = [u for u in await get_users(workspace_id) if u.get("user_id") != "USLACKBOT"]
+	run_id = await create_standup_run(workspace_id, created_by=created_by, invited_count=len(users))
+	if not await bind_run_lock(run_lock, owner, run_id):
+		await delete_standup_run(run_id)
+		raise RuntimeError(f"Run lock {run_lock} was taken over before run {run_id} started")
 	
 	# If no channel_id provided, try to get it from the workspace settings
 	if not channel_id:
-		channel_pref = get_channel_preference(workspace_id)
 		if channel_pref:
 			channel_id = channel_pref["channel_id"]
 			print(f"Using stored channel: {channel_pref['channel_name']} ({channel_id})")
 		else:
 			print("Warning: No channel selected for this workspace. Summary will not be posted.")
 	
-	users = get_users(workspace_id)
+	failures = 0
 	for u in users:
 		uid = u.get("user_id")
-		# Skip Slackbot explicitly
-		if uid == "USLACKBOT":
-			continue
 		try:
-			await send_dm_with_cache(workspace_id, uid, "Good morning! Standup time — please reply with: Yesterday / Today / Blockers")
+			await send_dm_with_cache(workspace_id, uid, "Good morning! Standup time — please reply with: Yesterday / Today / Blockers", client=client, user=u)
 		except Exception as e:
+			failures += 1
 			print("send dm error", e)
+	if users and failures == len(users):
+		await abandon_run(run_lock, owner, run_id)
+		raise RuntimeError(f"No standup DMs could be delivered for {workspace_id}; run {run_id} abandoned")
 	return run_id
@@ -0,0 +1,94 @@
+# Summaries as queued Celery jobs, run by a dedicated worker pool instead of inside /resume:
+#   celery -A summary_queue worker -Q summaries --concurrency=4
+# Global LLM concurrency is replicas x --concurrency (x LLM_MAX_CONCURRENCY at most per process).
+import os
+import math
+from celery import Celery
+from celery.signals import worker_init
+from common.redis_client import get_redis
+from common.tracing import init_tracing, span, inject_context
+from common.metrics import start_metrics_server, clear_multiproc_dir
+
+SUMMARY_QUEUE = os.getenv("SUMMARY_QUEUE", "0") == "1"  # 0 = summarize inline in /resume
+SUMMARY_QUEUE_NAME = "summaries"
+SUMMARY_COALESCE_TTL_SECONDS = int(os.getenv("SUMMARY_COALESCE_TTL_SECONDS", "3600"))
+SUMMARY_MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://standup-redis:6379/0")
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "9100"))
+
+celery = Celery("summaries", broker=REDIS_URL)
+celery.conf.task_default_queue = SUMMARY_QUEUE_NAME
+celery.conf.task_ignore_result = True
+celery.conf.task_acks_late = True
+# Hold only the running job so a big team queued later still jumps ahead
+celery.conf.worker_prefetch_multiplier = 1
+celery.conf.broker_transport_options = {"queue_order_strategy": "priority", "priority_steps": list(range(10)), "sep": ":"}
+
+@worker_init.connect
+def _init_worker(**kwargs):
+    init_tracing("standup-summary-worker")
+    clear_multiproc_dir()
+    start_metrics_server(WORKER_METRICS_PORT)
+
+def priority_for(team_size):
+    """Redis transport priority, 0 runs first: larger teams get their summary first"""
+    return max(0, 9 - int(math.log2(max(team_size, 1))))
+
+def _claim(run_id):
+    r = get_redis()
+    if r is None:
+        return True
+    try:
+        return bool(r.set(f"standup:summary:{run_id}", 1, nx=True, ex=SUMMARY_COALESCE_TTL_SECONDS))
+    except Exception as e:
+        print(f"⚠️ Summary coalescing skipped Redis: {e}")
+        return True
+
+def _release(run_id):
+    r = get_redis()
+    if r is not None:
+        try:
+            r.delete(f"standup:summary:{run_id}")
+        except Exception:
+            pass
+
+def enqueue_summary(workspace_id, run_id, channel_id=None, team_size=0):
+    """Queue the run's summary; repeated requests for the same run coalesce into one job.
+
+    Returns True if a job was queued, False if one already was.
+    """
+    if not _claim(run_id):
+        print(f"🔁 Summary for run {run_id} already queued")
+        return False
+    try:
+        summarize_run.apply_async(
+            args=[workspace_id, run_id, channel_id],
+            kwargs={"trace_context": inject_context()},
+            priority=priority_for(team_size),
+            task_id=f"summarize-{run_id}"
+        )
+    except Exception:
+        _release(run_id)
+        raise
+    return True
+
+@celery.task(name="summaries.summarize_run", bind=True, autoretry_for=(Exception,),
+             max_retries=SUMMARY_MAX_RETRIES, retry_backoff=True, retry_jitter=True)
+def summarize_run(self, workspace_id, run_id, channel_id=None, trace_context=None):
+    from db.models import get_standup_run
+    from agents.summarizer_agent import summarize_standups
+    from async_runner import run_async
+
+    with span("celery.summarize_run", carrier=trace_context or {}, workspace_id=workspace_id, run_id=run_id):
+        run = get_standup_run(run_id)
+        if run is None or run.get("status") == "closed":
+            # Redelivered (acks_late) or duplicate job: the run already has its summary
+            return {"skipped": True}
+        try:
+            result = run_async(summarize_standups(workspace_id, run_id, channel_id))
+        except Exception:
+            if self.request.retries >= self.max_retries:
+                # Out of retries: free the coalesce key so the next resume can queue the run again
+                _release(run_id)
+            raise
+        return {"response_count": result["response_count"]}
@@ -0,0 +1,75 @@
+# Tests import server modules the way the server does (cwd server/, PYTHONPATH=..)
+import itertools
+import os
+import sys
+
+import mongomock
+import pytest
+from pymongo import InsertOne, UpdateOne
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "server")]
+os.environ.setdefault("PRELOAD_GRAPH", "0")
+os.environ.setdefault("TRACING_EXPORTER", "")
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._cursor if length is None else itertools.islice(self._cursor, length))
+
+
+class AsyncCollection:
+    """Coroutine facade over a mongomock collection, shaped like AsyncMongoClient's"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def bulk_write(self, requests, ordered=True):
+        # mongomock's bulk_write lags behind pymongo's operation API, so apply ops one by one
+        for op in requests:
+            if isinstance(op, UpdateOne):
+                self._collection.update_one(op._filter, op._doc, upsert=op._upsert)
+            elif isinstance(op, InsertOne):
+                self._collection.insert_one(op._doc)
+            else:
+                raise NotImplementedError(type(op).__name__)
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return AsyncCollection(self._database[name])
+
+
+@pytest.fixture
+def mongo_db():
+    """A fresh in-memory database"""
+    return mongomock.MongoClient()["standup"]
+
+@pytest.fixture
+def async_mongo_db(mongo_db):
+    """mongo_db behind the coroutine API that get_async_db() returns"""
+    return AsyncDatabase(mongo_db)
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import db.analytics
+from db.analytics import build_analytics_updates, get_user_rollup, get_workspace_trends, local_day
+
+RUN = {"_id": "r1", "workspace_id": "T1", "created_at": datetime(2024, 3, 1, 23, 30), "invited_count": 3}
+RESPONSES = [
+    {"user_id": "U1", "text": "Yesterday: a\nToday: b\nBlockers: none", "created_at": datetime(2024, 3, 1, 23, 32)},
+    {"user_id": "U1", "text": "also: waiting on review", "created_at": datetime(2024, 3, 1, 23, 40)},
+    {"user_id": "U2", "text": "Yesterday: a\nToday: b\nBlockers: CI is red", "created_at": datetime(2024, 3, 1, 23, 35)},
+]
+
+def by_user(updates):
+    return {u._filter["user_id"]: u for u in updates}
+
+def test_workspace_bucket_counts():
+    updates = by_user(build_analytics_updates(RUN, RESPONSES))
+    ws = updates[None]
+    assert ws._filter == {"workspace_id": "T1", "user_id": None, "day": "2024-03-01"}
+    assert ws._doc["$inc"] == {
+        "runs": 1,
+        "invited": 3,
+        "responders": 2,
+        "responses": 3,
+        "blocker_responses": 2,
+        "latency_seconds_total": 120.0 + 300.0,
+        "latency_count": 2,
+    }
+
+def test_user_rows_use_the_first_reply_for_latency():
+    updates = by_user(build_analytics_updates(RUN, RESPONSES))
+    assert set(updates) == {None, "U1", "U2"}
+    assert updates["U1"]._doc["$inc"] == {
+        "runs_responded": 1,
+        "responses": 2,
+        "blocker_responses": 1,
+        "latency_seconds_total": 120.0,
+        "latency_count": 1,
+    }
+    assert updates["U2"]._doc["$inc"]["latency_seconds_total"] == 300.0
+
+def test_templated_replies_without_blockers_count_none():
+    responses = [{"user_id": u, "text": "Yesterday: a / Today: b / Blockers: n/a"} for u in ("U1", "U2")]
+    updates = by_user(build_analytics_updates(RUN, responses))
+    assert updates[None]._doc["$inc"]["blocker_responses"] == 0
+    assert updates[None]._doc["$inc"]["latency_count"] == 0
+
+def test_buckets_use_the_workspace_local_day():
+    # 23:30 UTC on the 1st is 08:30 on the 2nd in Tokyo
+    updates = build_analytics_updates(RUN, RESPONSES, "Asia/Tokyo")
+    assert {u._filter["day"] for u in updates} == {"2024-03-02"}
+    assert local_day(RUN["created_at"], "America/New_York") == "2024-03-01"
+    assert local_day(RUN["created_at"], "Not/AZone") == "2024-03-01"
+
+@pytest.fixture
+def mdb(mongo_db, monkeypatch):
+    monkeypatch.setattr(db.analytics, "analytics_col", mongo_db["standup_analytics"])
+    monkeypatch.setattr(db.analytics, "channel_preferences_col", mongo_db["channel_preferences"])
+    return mongo_db
+
+def close(database, run, responses, tz_name=None):
+    for u in build_analytics_updates(run, responses, tz_name):
+        database["standup_analytics"].update_one(u._filter, u._doc, upsert=True)
+
+def test_user_rollup_sums_the_window(mdb):
+    now = datetime.utcnow()
+    for days_ago in (1, 0):
+        started = now - timedelta(days=days_ago, minutes=30)
+        close(mdb, {"workspace_id": "T1", "created_at": started, "invited_count": 2}, [
+            {"user_id": "U1", "text": "stuck on CI", "created_at": started + timedelta(seconds=60)},
+        ] + ([{"user_id": "U2", "text": "done", "created_at": started + timedelta(seconds=180)}] if days_ago else []))
+
+    rollup = {u["user_id"]: u for u in get_user_rollup("T1", days=7)}
+    assert rollup["U1"] == {
+        "user_id": "U1",
+        "runs_responded": 2,
+        "responses": 2,
+        "participation_rate": 1.0,
+        "avg_response_latency_seconds": 60.0,
+        "blocker_responses": 2,
+    }
+    assert rollup["U2"]["participation_rate"] == 0.5
+    assert rollup["U2"]["avg_response_latency_seconds"] == 180.0
+
+def test_trends_window_uses_the_workspace_local_day(mdb):
+    mdb["channel_preferences"].insert_one({"workspace_id": "T1", "timezone": "Pacific/Kiritimati"})
+    started = datetime.utcnow()
+    close(mdb, {"workspace_id": "T1", "created_at": started, "invited_count": 1}, [], "Pacific/Kiritimati")
+    trends = get_workspace_trends("T1", days=1)
+    assert [t["day"] for t in trends] == [local_day(started, "Pacific/Kiritimati")]
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+import fakeredis
+import pytest
+
+from slack import dedup
+from slack.dedup import event_key, claim_event, release_event
+
+PAYLOAD = {"team_id": "T1", "event_id": "Ev1", "event": {"channel": "D1", "ts": "1700000000.000100"}}
+
+class BrokenRedis:
+    def set(self, *args, **kwargs):
+        raise ConnectionError("redis down")
+
+    def delete(self, *args):
+        raise ConnectionError("redis down")
+
+@pytest.fixture
+def redis(monkeypatch):
+    monkeypatch.setattr(dedup, "_seen", OrderedDict())
+    r = fakeredis.FakeRedis()
+    monkeypatch.setattr(dedup, "get_redis", lambda: r)
+    return r
+
+def other_process():
+    """Another replica: same Redis, empty in-process set"""
+    dedup._seen.clear()
+
+def test_key_is_team_channel_ts():
+    assert event_key(PAYLOAD) == "T1:D1:1700000000.000100"
+    # A retry gets a new event_id but the same message
+    assert event_key({**PAYLOAD, "event_id": "Ev2"}) == event_key(PAYLOAD)
+    assert event_key({"event_id": "Ev3", "event": {}}) == "Ev3"
+
+def test_retry_in_the_same_process_is_dropped_locally(redis, monkeypatch):
+    key = event_key(PAYLOAD)
+    assert claim_event(key)
+    monkeypatch.setattr(dedup, "get_redis", lambda: pytest.fail("Redis consulted"))
+    assert not claim_event(key)
+
+def test_retry_on_another_process_is_dropped_by_redis(redis):
+    key = event_key(PAYLOAD)
+    assert claim_event(key)
+    assert redis.exists(dedup.REDIS_KEY_PREFIX + key)
+    other_process()
+    assert not claim_event(key)
+
+def test_redis_error_lets_the_event_through(redis, monkeypatch):
+    monkeypatch.setattr(dedup, "get_redis", lambda: BrokenRedis())
+    key = event_key(PAYLOAD)
+    assert claim_event(key)
+    # The local tier still drops the retry in this process
+    assert not claim_event(key)
+    release_event(key)
+    assert claim_event(key)
+
+def test_release_after_failure_lets_the_next_delivery_in(redis):
+    key = event_key(PAYLOAD)
+    assert claim_event(key)
+    release_event(key)
+    assert not redis.exists(dedup.REDIS_KEY_PREFIX + key)
+    assert claim_event(key)
+    # Released on every replica, not just this one
+    release_event(key)
+    other_process()
+    assert claim_event(key)
+
+def test_no_redis_falls_back_to_the_local_set(redis, monkeypatch):
+    monkeypatch.setattr(dedup, "get_redis", lambda: None)
+    key = event_key(PAYLOAD)
+    assert claim_event(key)
+    assert not claim_event(key)
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agents import llm_guard
+from agents.llm_guard import CircuitBreaker, CircuitOpenError, call_llm
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_success()  # a success resets the count
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_breaker_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # the probe is in flight
+
+def test_breaker_probe_success_closes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+def test_breaker_probe_failure_reopens():
+    breaker = CircuitBreaker(failure_threshold=5, reset_seconds=0.05)
+    for _ in range(5):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()  # one failed probe is enough
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_breaker_release_frees_the_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+@pytest.fixture
+def guard(monkeypatch):
+    """One pool slot, a short deadline and a fresh breaker"""
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(llm_guard, "_get_pool", lambda: pool)
+    monkeypatch.setattr(llm_guard, "LLM_CALL_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(llm_guard, "breaker", CircuitBreaker(failure_threshold=2, reset_seconds=60))
+    yield llm_guard
+    pool.shutdown(wait=True, cancel_futures=True)
+
+def test_call_runs_off_the_event_loop(guard):
+    async def main():
+        loop_thread = threading.current_thread().name
+        ran_on = await call_llm(lambda: threading.current_thread().name)
+        return loop_thread, ran_on
+    loop_thread, ran_on = asyncio.run(main())
+    assert ran_on != loop_thread
+
+def test_bulkhead_rejects_overflow_calls(guard):
+    release = threading.Event()
+    overflow_ran = threading.Event()
+
+    async def main():
+        busy = asyncio.ensure_future(call_llm(release.wait, 1))
+        await asyncio.sleep(0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await call_llm(overflow_ran.set)
+        release.set()
+        with pytest.raises(asyncio.TimeoutError):
+            await busy
+    asyncio.run(main())
+    time.sleep(0.05)
+    # The overflow call was dropped from the queue, never reaching the provider
+    assert not overflow_ran.is_set()
+
+def test_open_breaker_skips_the_provider(guard):
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("provider down")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await call_llm(failing)
+        with pytest.raises(CircuitOpenError):
+            await call_llm(failing)
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert guard.breaker.state == "open"
+
+def test_slow_success_counts_against_the_breaker(guard, monkeypatch):
+    monkeypatch.setattr(llm_guard, "LLM_LATENCY_BUDGET_SECONDS", 0.01)
+
+    async def main():
+        for _ in range(2):
+            assert await call_llm(time.sleep, 0.02) is None
+    asyncio.run(main())
+    assert guard.breaker.state == "open"
@@ -0,0 +1,91 @@
+import pytest
+
+from agents.prompt_compaction import compact_responses, normalize_reply
+
+def compact_one(text, **kwargs):
+    assembled, stats = compact_responses([{"user_id": "U1", "text": text}], **kwargs)
+    return assembled, stats
+
+@pytest.mark.parametrize("text", [
+    "deploy at 10:30:45",
+    "14:00:00 UTC cutover",
+    "ratio 1:2:3",
+    "9:00 - 11:00: review",
+    "port localhost:8080:ready",
+    "Yesterday: fixed it",
+])
+def test_times_and_ratios_are_kept(text):
+    assert normalize_reply(text) == text
+
+@pytest.mark.parametrize("text, expected", [
+    ("shipped it :tada: finally", "shipped it finally"),
+    (":+1: looks good", "looks good"),
+    ("on it :-1:", "on it"),
+    ("hello :wave::skin-tone-2: team", "hello team"),
+    ("done :white_check_mark::rocket:", "done"),
+    ("blocked :sweat_smile: by CI", "blocked by CI"),
+])
+def test_shortcodes_are_stripped(text, expected):
+    assert normalize_reply(text) == expected
+
+def test_urls_become_labels_or_placeholders():
+    text = "see <https://example.com/pr/1|PR 1> and <https://example.com:8443/a:b:c> or https://x.io/y:z:w"
+    assert normalize_reply(text) == "see PR 1 and [link] or [link]"
+
+def test_slack_markup_is_flattened():
+    text = "pairing with <@U123|bob> in <#C42|eng> <!here> ```print(1)```"
+    assert normalize_reply(text) == "pairing with <@U123> in #eng @here [code]"
+
+def test_multiline_reply_becomes_one_line():
+    assert normalize_reply("Yesterday: a\n\n Today: b \nBlockers: none") == "Yesterday: a / Today: b / Blockers: none"
+
+def test_duplicates_and_empty_replies_counted_separately():
+    responses = [
+        {"user_id": "U1", "text": "Today: tests"},
+        {"user_id": "U1", "text": "today:  TESTS"},
+        {"user_id": "U1", "text": ""},
+        {"user_id": "U2", "text": ":tada:"},
+        {"user_id": "U2", "text": None},
+        {"user_id": "U3", "text": "Today: tests"},
+    ]
+    assembled, stats = compact_responses(responses)
+    assert assembled == "- <@U1>: Today: tests\n- <@U3>: Today: tests"
+    assert stats["duplicates_dropped"] == 1
+    assert stats["empty_dropped"] == 3
+    assert stats["users"] == 2
+
+def test_one_line_per_user():
+    responses = [{"user_id": "U1", "text": "Yesterday: a"}, {"user_id": "U1", "text": "Today: b"}]
+    assembled, _ = compact_responses(responses)
+    assert assembled == "- <@U1>: Yesterday: a / Today: b"
+
+def test_long_reply_truncated():
+    assembled, stats = compact_one("x" * 100, max_reply_chars=20)
+    assert assembled == "- <@U1>: " + "x" * 19 + "…"
+    assert stats["truncated"] == 1
+
+def test_token_budget_shares_space_and_keeps_short_replies():
+    responses = [{"user_id": f"U{i}", "text": "y" * 400} for i in range(5)]
+    responses.append({"user_id": "U9", "text": "short update"})
+    assembled, stats = compact_responses(responses, token_budget=200)
+    assert stats["tokens_after"] <= 200
+    assert "- <@U9>: short update" in assembled
+    assert stats["truncated"] == 5
+    assert stats["tokens_before"] > stats["tokens_after"]
+
+@pytest.mark.parametrize("users", [1000, 3000])
+def test_token_budget_holds_for_large_teams(users):
+    responses = [{
+        "user_id": f"U{i:08d}",
+        "text": "Yesterday: shipped onboarding / Today: reviews / Blockers: " + ("waiting on review" if i % 100 == 0 else "none"),
+    } for i in range(users)]
+    assembled, stats = compact_responses(responses, token_budget=4000)
+    assert stats["tokens_after"] <= 4000
+    assert stats["budget_met"]
+    assert stats["users_dropped"] == users - stats["users"] > 0
+    # Blockers are kept before the sample of everyone else
+    assert all(f"<@U{i:08d}>" in assembled for i in range(0, users, 100))
+
+def test_budget_met_when_nothing_is_cut():
+    _, stats = compact_one("Today: tests")
+    assert stats["budget_met"] and stats["users_dropped"] == 0
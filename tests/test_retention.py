@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+
+from common.retention import is_blocker, build_history_document
+
+@pytest.mark.parametrize("text", [
+    "Blockers: none",
+    "Blockers: None.",
+    "Blockers: n/a",
+    "Blockers: no",
+    "Blockers: nothing yet",
+    "Blockers: -",
+    "Blockers:",
+    "Blockers: no blockers, all good",
+    "No blockers",
+    "no blockers today",
+    "unblocked the deploy",
+    "I'm not stuck anymore",
+    "isn't blocked by anything now",
+    "Yesterday: reviewed PRs\nToday: release prep\nBlockers: none",
+    "Yesterday: reviewed PRs / Today: release prep / Blockers: n/a",
+    "",
+    None,
+])
+def test_templated_and_negated_replies_are_not_blockers(text):
+    assert not is_blocker(text)
+
+@pytest.mark.parametrize("text", [
+    "blocked by the infra team",
+    "Blocked on security review",
+    "stuck on flaky tests",
+    "waiting on design",
+    "Waiting for QA sign-off",
+    "Blockers: waiting on design",
+    "Blockers: staging db is down",
+    "Blocker: no access to prod",
+    "Yesterday: reviewed PRs\nToday: release prep\nBlockers: need the API key from ops",
+])
+def test_blocker_replies(text):
+    assert is_blocker(text)
+
+def test_the_blockers_section_decides_over_the_rest_of_the_reply():
+    assert not is_blocker("Yesterday: was stuck on CI, fixed now\nToday: deploy\nBlockers: none")
+
+def test_history_keeps_only_real_blockers():
+    run = {"_id": "r1", "workspace_id": "T1", "created_at": datetime(2024, 3, 1, 9)}
+    responses = [
+        {"user_id": "U1", "text": "Yesterday: a\nToday: b\nBlockers: none"},
+        {"user_id": "U2", "text": "Yesterday: a\nToday: b\nBlockers: waiting on review"},
+        {"user_id": "U3", "text": "unblocked the deploy"},
+    ]
+    doc = build_history_document(run, responses)
+    assert [b["user_id"] for b in doc["blockers"]] == ["U2"]
+    assert doc["participant_count"] == 3
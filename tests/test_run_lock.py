@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+import db.async_models
+import db.run_lock
+from db.run_lock import run_lock_key, acquire_run_lock, bind_run_lock, release_run_lock
+
+WS = "T1"
+
+@pytest.fixture
+def mdb(mongo_db, async_mongo_db, monkeypatch):
+    monkeypatch.setattr(db.run_lock, "get_async_db", lambda: async_mongo_db)
+    monkeypatch.setattr(db.async_models, "get_async_db", lambda: async_mongo_db)
+    return mongo_db
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_run_lock_key_uses_the_workspace_day():
+    now = datetime(2024, 3, 1, 23, 30, tzinfo=timezone.utc)
+    assert run_lock_key(WS, "UTC", now) == "T1:2024-03-01"
+    assert run_lock_key(WS, "Asia/Tokyo", now) == "T1:2024-03-02"
+    assert run_lock_key(WS, "Not/AZone", now) == "T1:2024-03-01"
+
+def test_second_start_attaches_to_the_holder(mdb):
+    assert run(acquire_run_lock("k", "a"))[0]
+    acquired, lock = run(acquire_run_lock("k", "b"))
+    assert not acquired and lock["owner"] == "a"
+
+def test_expired_lease_is_taken_over_until_bound(mdb):
+    run(acquire_run_lock("k", "a", lease_seconds=-1))
+    acquired, lock = run(acquire_run_lock("k", "b", lease_seconds=-1))
+    assert acquired and lock["owner"] == "b"
+    assert not run(bind_run_lock("k", "a", "r1"))
+    assert run(bind_run_lock("k", "b", "r1"))
+    acquired, lock = run(acquire_run_lock("k", "c"))
+    assert not acquired and lock["run_id"] == "r1"
+
+def test_release_only_frees_an_unbound_or_matching_lock(mdb):
+    run(acquire_run_lock("k", "a"))
+    run(bind_run_lock("k", "a", "r1"))
+    run(release_run_lock("k", "a"))
+    assert mdb.standup_run_locks.count_documents({}) == 1
+    run(release_run_lock("k", "a", "r2"))
+    assert mdb.standup_run_locks.count_documents({}) == 1
+    run(release_run_lock("k", "a", "r1"))
+    assert mdb.standup_run_locks.count_documents({}) == 0
+
+def test_lost_bind_deletes_the_run(mdb):
+    from agents import standup_agent
+    mdb.workspaces.insert_one({"workspace_id": WS, "bot_token": "xoxb-test"})
+    mdb.users.insert_one({"workspace_id": WS, "user_id": "U1"})
+    run(acquire_run_lock("k", "someone-else"))
+    with pytest.raises(RuntimeError):
+        run(standup_agent.collect_standups(WS, run_lock="k", owner="us"))
+    assert mdb.standup_runs.count_documents({}) == 0
+
+class _Slack:
+    """send_dm_with_cache stand-in; fails every DM while down"""
+    def __init__(self):
+        self.down = True
+        self.sent = []
+
+    async def send(self, workspace_id, user_id, text, client=None, user=None):
+        if self.down:
+            raise Exception("channel_not_found")
+        self.sent.append(user_id)
+
+@pytest.fixture
+def start(mdb, monkeypatch):
+    import graph
+    from agents import standup_agent
+    slack = _Slack()
+    monkeypatch.setattr(standup_agent, "send_dm_with_cache", slack.send)
+    mdb.workspaces.insert_one({"workspace_id": WS, "bot_token": "xoxb-test"})
+    mdb.users.insert_many([{"workspace_id": WS, "user_id": u} for u in ("U1", "U2")])
+    mdb.channel_preferences.insert_one({"workspace_id": WS, "channel_id": "C1", "channel_name": "standup", "timezone": "UTC"})
+    return slack, lambda: run(graph.start_standup_endpoint(WS))
+
+def test_start_that_sent_no_dms_can_be_retried(mdb, start):
+    slack, start_standup = start
+    failed = start_standup()
+    assert failed["success"] is False
+    assert mdb.standup_run_locks.count_documents({}) == 0
+    assert mdb.standup_runs.count_documents({}) == 0
+
+    slack.down = False
+    retried = start_standup()
+    assert retried["success"] and not retried.get("attached")
+    assert sorted(slack.sent) == ["U1", "U2"]
+    runs = list(mdb.standup_runs.find())
+    assert len(runs) == 1
+    assert mdb.standup_run_locks.find_one()["run_id"] == str(runs[0]["_id"])
+
+    again = start_standup()
+    assert again["attached"] and again["thread_id"] == retried["thread_id"]
+    assert again["run_id"] == str(runs[0]["_id"])
+    assert mdb.standup_runs.count_documents({}) == 1
+
+def test_start_for_unknown_workspace_leaves_nothing_behind(mdb, start):
+    mdb.workspaces.delete_many({})
+    _, start_standup = start
+    assert start_standup()["success"] is False
+    assert mdb.standup_run_locks.count_documents({}) == 0
+    assert mdb.standup_runs.count_documents({}) == 0
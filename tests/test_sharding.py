@@ -0,0 +1,63 @@
+from collections import Counter
+
+from common.sharding import HashRing
+
+NODES = [f"http://standup-server-{i}:4000" for i in range(4)]
+WORKSPACES = [f"T{i:06d}" for i in range(20000)]
+
+def assignments(ring):
+    return {ws: ring.node_for(ws) for ws in WORKSPACES}
+
+def test_same_key_same_node():
+    ring = HashRing(NODES)
+    assert all(ring.node_for(ws) == HashRing(list(NODES)).node_for(ws) for ws in WORKSPACES[:500])
+
+def test_node_order_does_not_matter():
+    assert assignments(HashRing(NODES)) == assignments(HashRing(list(reversed(NODES))))
+
+def test_empty_ring_has_no_owner():
+    assert HashRing([]).node_for("T1") is None
+
+def test_spread_is_even():
+    counts = Counter(assignments(HashRing(NODES)).values())
+    assert set(counts) == set(NODES)
+    expected = len(WORKSPACES) / len(NODES)
+    # 128 virtual nodes keep every replica within ~25% of its fair share
+    assert all(abs(n - expected) / expected < 0.25 for n in counts.values())
+
+def test_adding_a_node_only_moves_keys_to_it():
+    before = assignments(HashRing(NODES))
+    new_node = "http://standup-server-4:4000"
+    after = assignments(HashRing(NODES + [new_node]))
+    moved = [ws for ws in WORKSPACES if before[ws] != after[ws]]
+    assert all(after[ws] == new_node for ws in moved)
+    # About 1/5 of the keys move to the new node, not a reshuffle
+    assert 0.1 < len(moved) / len(WORKSPACES) < 0.3
+
+def test_removing_a_node_only_moves_its_keys():
+    before = assignments(HashRing(NODES))
+    removed = NODES[1]
+    after = assignments(HashRing([n for n in NODES if n != removed]))
+    for ws in WORKSPACES:
+        if before[ws] == removed:
+            assert after[ws] != removed
+        else:
+            assert after[ws] == before[ws]
+
+def test_owns_follows_the_ring(monkeypatch):
+    from common import sharding
+
+    monkeypatch.setattr(sharding, "SERVER_SHARDS", NODES)
+    monkeypatch.setattr(sharding, "_ring", HashRing(NODES))
+    owner = sharding.shard_for("T000042")
+    monkeypatch.setattr(sharding, "SHARD_SELF", owner)
+    assert sharding.owns("T000042")
+    monkeypatch.setattr(sharding, "SHARD_SELF", next(n for n in NODES if n != owner))
+    assert not sharding.owns("T000042")
+
+def test_sharding_off_with_one_replica(monkeypatch):
+    from common import sharding
+
+    monkeypatch.setattr(sharding, "SERVER_SHARDS", NODES[:1])
+    assert sharding.shard_for("T1", default="http://local") == "http://local"
+    assert sharding.owns("T1")
@@ -0,0 +1,31 @@
+import asyncio
+
+from agents import summarizer_agent
+
+def summarize(monkeypatch, responses):
+    closed = {}
+
+    async def get_responses(workspace_id, run_id):
+        return responses
+
+    async def close(run_id, summary=None):
+        closed[run_id] = summary
+
+    def llm(prompt):
+        raise AssertionError("LLM called")
+
+    monkeypatch.setattr(summarizer_agent, "get_responses_for_run", get_responses)
+    monkeypatch.setattr(summarizer_agent, "close_standup_run", close)
+    monkeypatch.setattr(summarizer_agent, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(summarizer_agent, "_invoke_llm", llm)
+    result = asyncio.run(summarizer_agent.summarize_standups("T1", "r1"))
+    return result, closed
+
+def test_only_empty_replies_skip_the_llm(monkeypatch):
+    result, closed = summarize(monkeypatch, [{"user_id": "U1", "text": ":tada:"}, {"user_id": "U2", "text": ""}])
+    assert result == {"summary": "No responses collected.", "response_count": 2}
+    assert closed == {"r1": "No responses collected."}
+
+def test_no_replies_skip_the_llm(monkeypatch):
+    result, _ = summarize(monkeypatch, [])
+    assert result["summary"] == "No responses collected."